@@ -7,8 +7,10 @@ Desktop application for Rockchip RK3568 boards with camera/scale integration
 import sys
 import os
 import json
+import threading
 import cv2
 import numpy as np
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
@@ -19,7 +21,6 @@ DEBUG = False
 # Suppress OpenCV warnings and errors
 os.environ['OPENCV_VIDEOIO_DEBUG'] = '0'
 os.environ['OPENCV_VIDEOIO_PRIORITY_MSMF'] = '0'
-cv2.setUseOptimized(True)
 
 # Suppress Qt warnings
 os.environ['QT_LOGGING_RULES'] = '*.debug=false;qt.qpa.*=false'
@@ -37,7 +38,9 @@ try:
         QLabel, QPushButton, QComboBox, QSlider, QGroupBox, QGridLayout,
         QSplitter, QStatusBar, QMessageBox, QCheckBox
     )
-    from PySide6.QtCore import Qt, QTimer, Signal, QThread, QSize
+    from PySide6.QtCore import (
+        Qt, QTimer, Signal, Slot, QObject, QThread, QRunnable, QThreadPool, QSize
+    )
     from PySide6.QtGui import QPixmap, QImage, QFont, QPalette, QColor
     QT_FRAMEWORK = "PySide6"
 except ImportError:
@@ -47,7 +50,10 @@ except ImportError:
             QLabel, QPushButton, QComboBox, QSlider, QGroupBox, QGridLayout,
             QSplitter, QStatusBar, QMessageBox, QCheckBox
         )
-        from PyQt5.QtCore import Qt, QTimer, pyqtSignal as Signal, QThread, QSize
+        from PyQt5.QtCore import (
+            Qt, QTimer, pyqtSignal as Signal, pyqtSlot as Slot, QObject, QThread,
+            QRunnable, QThreadPool, QSize
+        )
         from PyQt5.QtGui import QPixmap, QImage, QFont, QPalette, QColor
         QT_FRAMEWORK = "PyQt5"
         print("Using PyQt5 fallback for ARM64 compatibility")
@@ -56,7 +62,14 @@ except ImportError:
         print("For ARM64 systems, install: sudo apt-get install python3-pyqt5")
         sys.exit(1)
 
-from camera_backend import CameraBackend
+# Qt >= 5.14 can wrap BGR data directly, saving a color conversion per frame
+QIMAGE_FORMAT_BGR888 = getattr(QImage, 'Format_BGR888', None)
+
+from camera_backend import CameraBackend, LatestFrameCapture
+from ai_scale_kernels import NUMBA_AVAILABLE
+
+if NUMBA_AVAILABLE:
+    from ai_scale_kernels import fused_process
 
 try:
     from scale_interface import ScaleInterface
@@ -73,131 +86,299 @@ except ImportError:
 
 DEBUG = False
 
+@dataclass(frozen=True)
+class FrameSettings:
+    """Snapshot of the image processing controls used for each frame"""
+    brightness: float = 0.0
+    contrast: float = 1.0
+    gamma: float = 1.0
+    saturation: float = 1.0
+    vibrance: float = 0.0
+    white_balance: float = 0.0
+    clahe_enabled: bool = False
+    clahe_tiles: int = 8
+    is_identity: bool = field(init=False, repr=False, compare=False)
+    
+    # Fields that only tune another control and never change the image on their own
+    TUNING_FIELDS = ('clahe_tiles',)
+    
+    def __post_init__(self):
+        # Precompute whether every control is at its default (no-op pipeline)
+        object.__setattr__(self, 'is_identity', all(
+            getattr(self, f.name) == f.default for f in fields(self)
+            if f.init and f.name not in self.TUNING_FIELDS))
+    
+    @classmethod
+    def from_dict(cls, settings: Dict[str, float]) -> 'FrameSettings':
+        """Build from a settings dictionary, ignoring unknown keys"""
+        return cls(**{f.name: settings[f.name] for f in fields(cls)
+                      if f.init and f.name in settings})
+
 class ImageProcessor:
     """Advanced image processing for color correction and enhancement"""
     
+    # Every processor shares Numba's one thread pool, and its workqueue layer
+    # (the fallback without TBB/OpenMP) aborts on concurrent parallel launches,
+    # so the preview worker and capture path take turns in the fused kernel
+    _fused_lock = threading.Lock()
+    
+    # Worst-case difference (8-bit levels) allowed between the fused kernel and
+    # the OpenCV path. The kernel follows OpenCV's SIMD HSV->BGR, which
+    # truncates; OpenCV's scalar code for the last (width mod SIMD width)
+    # pixels of a row rounds instead, so only those pixels can be 1 level off
+    FUSED_MAX_ERROR = 1
+    
+    # Settings the start-up check runs both paths with
+    FUSED_CHECK_SETTINGS = (
+        FrameSettings(brightness=0.1, contrast=1.2, gamma=1.2, saturation=1.4, vibrance=0.5),
+        FrameSettings(gamma=0.8, saturation=0.6, white_balance=-0.5),
+        FrameSettings(contrast=0.8, vibrance=1.0, white_balance=0.7),
+    )
+    
     def __init__(self):
         # Natural CLAHE for visually pleasing local contrast
         self.clahe_bgr = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
         self.clahe_lab = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+        self._clahe_tiles = 8
+        self._gamma_luts = {}
+        self._tone_lut_key = None
+        self._tone_lut = None
+        
+        # Frame buffers reused across frames (allocated on first frame / resize)
+        self._buf_a = None
+        self._buf_b = None
+        self._lab = None
+        self._hsv = None
+        self._plane = None
+        
+        # Warm up the JIT so the first camera frame doesn't pay the compile cost,
+        # and keep to OpenCV if the kernel's output drifts from it
+        self._use_fused = False
+        if NUMBA_AVAILABLE:
+            error = self.fused_max_error()
+            self._use_fused = error <= self.FUSED_MAX_ERROR
+            if not self._use_fused:
+                print(f"Warning: fused kernel is {error} levels off the OpenCV path, "
+                      "using OpenCV")
+    
+    def fused_max_error(self) -> int:
+        """Largest channel difference between the fused kernel and the OpenCV path
+        
+        Both run over a grid of 32768 colours with each of FUSED_CHECK_SETTINGS.
+        """
+        levels = np.arange(4, 256, 8, dtype=np.uint8)
+        grid = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1)
+        grid = np.ascontiguousarray(grid.reshape(512, 64, 3))
+        self._ensure_buffers(grid.shape)
+        worst = 0
+        for settings in self.FUSED_CHECK_SETTINGS:
+            # Both paths write the same ping-pong buffers, so keep a copy
+            fused = self._process_frame_fused(grid, settings).astype(np.int16)
+            reference = self._process_frame_opencv(grid, settings)
+            worst = max(worst, int(np.abs(fused - reference).max()))
+        return worst
     
-    def apply_white_balance(self, image: np.ndarray, temp_offset: float = 0.0) -> np.ndarray:
+    def _get_gamma_lut(self, gamma: float) -> np.ndarray:
+        """Get (cached) 256-entry gamma lookup table"""
+        table = self._gamma_luts.get(gamma)
+        if table is None:
+            inv_gamma = 1.0 / gamma
+            table = np.array([((i / 255.0) ** inv_gamma) * 255 
+                             for i in np.arange(0, 256)]).astype("uint8")
+            self._gamma_luts[gamma] = table
+        return table
+    
+    def _get_tone_lut(self, contrast: float, brightness: int, gamma: float) -> np.ndarray:
+        """Get the LUT for contrast/brightness followed by gamma (cached for the last key)"""
+        key = (round(contrast, 3), brightness, gamma)
+        if key != self._tone_lut_key:
+            # Same midpoint-shift mapping as addWeighted, rounded and saturated
+            table = np.arange(256, dtype=np.float64) * key[0] + (1 - key[0]) * 128 + brightness
+            table = np.clip(np.rint(table), 0, 255).astype(np.uint8)
+            if gamma != 1.0:
+                table = self._get_gamma_lut(gamma)[table]
+            self._tone_lut_key = key
+            self._tone_lut = table
+        return self._tone_lut
+    
+    def _ensure_buffers(self, shape: Tuple[int, ...]):
+        """Allocate the reusable frame buffers if the frame shape changed"""
+        if self._buf_a is not None and self._buf_a.shape == shape:
+            return
+        self._buf_a = np.empty(shape, dtype=np.uint8)
+        self._buf_b = np.empty(shape, dtype=np.uint8)
+        self._lab = np.empty(shape, dtype=np.uint8)
+        self._hsv = np.empty(shape, dtype=np.uint8)
+        self._plane = np.empty(shape[:2], dtype=np.uint8)
+    
+    def owns_buffer(self, image: np.ndarray) -> bool:
+        """Check whether image is one of the reusable buffers the next frame overwrites"""
+        return image is self._buf_a or image is self._buf_b
+    
+    def _next_buffer(self, src: np.ndarray) -> np.ndarray:
+        """Get the ping-pong buffer that does not alias src"""
+        return self._buf_b if src is self._buf_a else self._buf_a
+    
+    def apply_white_balance(self, image: np.ndarray, temp_offset: float = 0.0,
+                            dst: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply white balance correction to reduce bluish haze"""
         if image is None or image.size == 0:
             return image
             
         # Convert to LAB color space for better color manipulation
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=self._lab)
         
         # Adjust A and B channels to correct color temperature
         # Positive temp_offset reduces blue cast, negative increases warmth
-        a_adj = cv2.add(a, int(temp_offset * 10))  # Green-Red axis
-        b_adj = cv2.subtract(b, int(temp_offset * 8))  # Blue-Yellow axis
+        a = cv2.extractChannel(lab, 1, dst=self._plane)
+        a = cv2.add(a, int(temp_offset * 10), dst=a)  # Green-Red axis
+        cv2.insertChannel(a, lab, 1)
+        b = cv2.extractChannel(lab, 2, dst=self._plane)
+        b = cv2.subtract(b, int(temp_offset * 8), dst=b)  # Blue-Yellow axis
+        cv2.insertChannel(b, lab, 2)
         
-        # Merge and convert back
-        lab_balanced = cv2.merge([l, a_adj, b_adj])
-        balanced = cv2.cvtColor(lab_balanced, cv2.COLOR_LAB2BGR)
-        
-        return balanced
+        # Convert back
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=dst)
     
     def enhance_colors(self, image: np.ndarray, saturation: float = 1.0, 
-                      vibrance: float = 0.0) -> np.ndarray:
+                      vibrance: float = 0.0, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """Enhance color accuracy, especially reds, greens, yellows"""
         if image is None or image.size == 0:
             return image
             
-        # Convert to HSV for saturation adjustment
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        h, s, v = cv2.split(hsv)
+        # Convert to HSV and work on the saturation plane only
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=self._hsv)
+        s = cv2.extractChannel(hsv, 1, dst=self._plane)
         
-        # Apply saturation enhancement
+        # Apply saturation enhancement (saturating uint8 scale)
         if saturation != 1.0:
-            s = cv2.multiply(s, saturation)
-            s = np.clip(s, 0, 255).astype(np.uint8)
+            s = cv2.convertScaleAbs(s, dst=s, alpha=saturation, beta=0.0)
         
         # Apply vibrance (selective saturation for less saturated colors)
         if vibrance > 0:
-            # Create mask for less saturated pixels
-            mask = s < 128
-            s = s.astype(np.int16)
-            s[mask] = np.clip(s[mask] + int(vibrance * 30), 0, 255)
-            s = s.astype(np.uint8)
+            # Mask of less saturated pixels (255 where S < 128), turned into a
+            # per-pixel boost of either 0 or the vibrance amount
+            mask = cv2.compare(s, 128, cv2.CMP_LT)
+            boost = cv2.bitwise_and(mask, int(vibrance * 30), dst=mask)
+            s = cv2.add(s, boost, dst=s)
         
-        enhanced = cv2.merge([h, s, v])
-        return cv2.cvtColor(enhanced, cv2.COLOR_HSV2BGR)
+        cv2.insertChannel(s, hsv, 1)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR, dst=dst)
     
-    def apply_gamma_correction(self, image: np.ndarray, gamma: float = 1.0) -> np.ndarray:
+    def apply_gamma_correction(self, image: np.ndarray, gamma: float = 1.0,
+                               dst: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply gamma correction for brightness/contrast balance"""
         if image is None or image.size == 0 or gamma == 1.0:
             return image
         # Clamp gamma to avoid division by zero
         gamma = max(gamma, 0.01)
-        inv_gamma = 1.0 / gamma
-        table = np.array([((i / 255.0) ** inv_gamma) * 255 
-                         for i in np.arange(0, 256)]).astype("uint8")
-        return cv2.LUT(image, table)
+        return cv2.LUT(image, self._get_gamma_lut(gamma), dst=dst)
+    
+    def set_clahe_tiles(self, tiles: int):
+        """Set the CLAHE tile grid (tiles x tiles), reusing the existing CLAHE objects"""
+        if tiles == self._clahe_tiles:
+            return
+        self.clahe_bgr.setTilesGridSize((tiles, tiles))
+        self.clahe_lab.setTilesGridSize((tiles, tiles))
+        self._clahe_tiles = tiles
     
-    def apply_clahe(self, image: np.ndarray, channel: str = 'lab') -> np.ndarray:
+    def apply_clahe(self, image: np.ndarray, channel: str = 'lab',
+                    dst: Optional[np.ndarray] = None) -> np.ndarray:
         if DEBUG:
             print("apply_clahe called")
         if image is None or image.size == 0:
             return image
         if channel == 'lab':
             # Apply to L channel in LAB space
-            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-            l, a, b = cv2.split(lab)
-            l_clahe = self.clahe_lab.apply(l)
-            enhanced = cv2.merge([l_clahe, a, b])
-            lab2bgr = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
-            # Also apply to BGR for extra drama
-            b, g, r = cv2.split(lab2bgr)
-            b = self.clahe_bgr.apply(b)
-            g = self.clahe_bgr.apply(g)
-            r = self.clahe_bgr.apply(r)
-            return cv2.merge([b, g, r])
+            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=self._lab)
+            l = cv2.extractChannel(lab, 0, dst=self._plane)
+            # CLAHE interpolates between tile LUTs anyway, so equalize a half-size
+            # L plane and upsample only the change it makes
+            l_small = cv2.resize(l, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+            l_small_clahe = self.clahe_lab.apply(l_small)
+            delta_small = cv2.subtract(l_small_clahe, l_small, dtype=cv2.CV_16S)
+            delta = cv2.resize(delta_small, (l.shape[1], l.shape[0]),
+                               interpolation=cv2.INTER_LINEAR)
+            l_clahe = cv2.add(l, delta, dst=l, dtype=cv2.CV_8U)
+            cv2.insertChannel(l_clahe, lab, 0)
+            return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=dst)
         else:
             # Apply to each BGR channel
             b, g, r = cv2.split(image)
-            b_clahe = self.clahe_bgr.apply(b)
-            g_clahe = self.clahe_bgr.apply(g)
-            r_clahe = self.clahe_bgr.apply(r)
-            return cv2.merge([b_clahe, g_clahe, r_clahe])
+            b_clahe = self.clahe_bgr.apply(b, dst=b)
+            g_clahe = self.clahe_bgr.apply(g, dst=g)
+            r_clahe = self.clahe_bgr.apply(r, dst=r)
+            return cv2.merge([b_clahe, g_clahe, r_clahe], dst=dst)
     
-    def process_frame(self, image: np.ndarray, settings: Dict[str, float]) -> np.ndarray:
+    def process_frame(self, image: np.ndarray, settings: FrameSettings) -> np.ndarray:
+        """Run the full enhancement pipeline on a BGR frame
+        
+        The result may be the input image itself or one of the processor's
+        reusable buffers, which the next call overwrites; copy it to keep it.
+        """
         if DEBUG:
-            print(f"[DEBUG] process_frame called with clahe_enabled={settings.get('clahe_enabled', False)}")
+            print(f"[DEBUG] process_frame called with clahe_enabled={settings.clahe_enabled}")
             print("process_frame settings:", settings)
         if image is None or image.size == 0:
             return image
-        result = image.copy()
+        # Nothing to do with every control at its default
+        if settings.is_identity:
+            return image
+        self._ensure_buffers(image.shape)
+        if self._use_fused and not settings.clahe_enabled:
+            return self._process_frame_fused(image, settings)
+        return self._process_frame_opencv(image, settings)
+    
+    def _process_frame_opencv(self, image: np.ndarray, settings: FrameSettings) -> np.ndarray:
+        """Run the pipeline as a sequence of OpenCV passes"""
+        result = image
         # White balance correction (reduces bluish haze)
-        if settings.get('white_balance', 0.0) != 0.0:
-            result = self.apply_white_balance(result, settings['white_balance'])
+        if settings.white_balance != 0.0:
+            result = self.apply_white_balance(result, settings.white_balance,
+                                              dst=self._next_buffer(result))
         # Brightness and contrast (midpoint-shift for photo editor effect)
-        brightness_norm = settings.get('brightness', 0.0)  # -1.0 to +1.0
+        brightness_norm = settings.brightness              # -1.0 to +1.0
         brightness = int(brightness_norm * 100)            # -100 to +100 for OpenCV
-        contrast = settings.get('contrast', 1.0)           # 0.1 to 2.0 for OpenCV
+        contrast = settings.contrast                       # 0.1 to 2.0 for OpenCV
         contrast = max(contrast, 0.01)  # Prevent black screen at zero contrast
-        mid = 128
-        if brightness != 0 or contrast != 1.0:
-            result = cv2.addWeighted(result, contrast, np.full(result.shape, mid, result.dtype), 1 - contrast, brightness)
         # Gamma correction (with safety check)
-        gamma = settings.get('gamma', 1.0)
+        gamma = settings.gamma
         gamma = max(gamma, 0.01)  # Prevent black screen at zero gamma
-        if gamma != 1.0:
-            result = self.apply_gamma_correction(result, gamma)
+        if brightness != 0 or contrast != 1.0 or gamma != 1.0:
+            # contrast * (x - 128) + 128 + brightness and then gamma are both
+            # per-value maps on uint8, so compose them into one table lookup
+            result = cv2.LUT(result, self._get_tone_lut(contrast, brightness, gamma),
+                             dst=self._next_buffer(result))
         # Color enhancement
-        if settings.get('saturation', 1.0) != 1.0 or settings.get('vibrance', 0.0) != 0.0:
+        if settings.saturation != 1.0 or settings.vibrance != 0.0:
             result = self.enhance_colors(result, 
-                                       settings.get('saturation', 1.0),
-                                       settings.get('vibrance', 0.0))
+                                       settings.saturation,
+                                       settings.vibrance,
+                                       dst=self._next_buffer(result))
         # CLAHE for local contrast
-        if settings.get('clahe_enabled', False):
+        if settings.clahe_enabled:
             if DEBUG:
                 print("CLAHE ENABLED - applying CLAHE")
-            result = self.apply_clahe(result, 'lab')
+            self.set_clahe_tiles(settings.clahe_tiles)
+            result = self.apply_clahe(result, 'lab', dst=self._next_buffer(result))
         return result
+    
+    def _process_frame_fused(self, image: np.ndarray, settings: FrameSettings) -> np.ndarray:
+        """Run the pointwise part of the pipeline as a single Numba pass"""
+        result = image
+        # White balance goes through LAB, which isn't a per-channel map, so it
+        # stays on OpenCV ahead of the kernel
+        if settings.white_balance != 0.0:
+            result = self.apply_white_balance(result, settings.white_balance,
+                                              dst=self._next_buffer(result))
+        contrast = max(settings.contrast, 0.01)
+        brightness = int(settings.brightness * 100)
+        gamma = max(settings.gamma, 0.01)
+        with self._fused_lock:
+            return fused_process(result, self._get_tone_lut(contrast, brightness, gamma),
+                                 float(settings.saturation),
+                                 float(settings.vibrance),
+                                 self._next_buffer(result))
 
 
 class CameraControlWidget(QWidget):
@@ -205,6 +386,8 @@ class CameraControlWidget(QWidget):
     
     settings_changed = Signal(dict)
     
+    CLAHE_TILE_OPTIONS = (4, 8, 16)
+    
     def __init__(self):
         super().__init__()
         self.settings = {
@@ -214,8 +397,17 @@ class CameraControlWidget(QWidget):
             'saturation': 1.0,
             'vibrance': 0.0,
             'white_balance': 0.0,
-            'clahe_enabled': False
+            'clahe_enabled': False,
+            'clahe_tiles': 8
         }
+        self._pending = None
+        
+        # Coalesce rapid slider movement into at most one emit per ~16 ms
+        self._emit_timer = QTimer(self)
+        self._emit_timer.setSingleShot(True)
+        self._emit_timer.setInterval(16)
+        self._emit_timer.timeout.connect(self._do_emit)
+        
         self.init_ui()
     
     def init_ui(self):
@@ -313,6 +505,17 @@ class CameraControlWidget(QWidget):
         self.clahe_on_label.hide()
         advanced_layout.addWidget(self.clahe_on_label)
         
+        # CLAHE tile grid (more tiles = smaller, more local histograms)
+        tiles_layout = QHBoxLayout()
+        tiles_layout.addWidget(QLabel("CLAHE Tiles:"))
+        self.clahe_tiles_combo = QComboBox()
+        for tiles in self.CLAHE_TILE_OPTIONS:
+            self.clahe_tiles_combo.addItem(f"{tiles}×{tiles}", tiles)
+        self.clahe_tiles_combo.setCurrentIndex(self.CLAHE_TILE_OPTIONS.index(8))
+        self.clahe_tiles_combo.currentIndexChanged.connect(self.update_clahe_tiles)
+        tiles_layout.addWidget(self.clahe_tiles_combo)
+        advanced_layout.addLayout(tiles_layout)
+        
         # Reset button
         reset_btn = QPushButton("Reset All")
         reset_btn.setStyleSheet("background: #f0f0f3; color: #007aff; font-weight: 600; font-size: 16px; border-radius: 8px; margin-top: 10px;")
@@ -325,41 +528,50 @@ class CameraControlWidget(QWidget):
         layout.addStretch()
         self.setLayout(layout)
     
+    def _schedule_emit(self):
+        """Queue a settings_changed emit, restarting the debounce timer"""
+        self._pending = self.get_settings()
+        self._emit_timer.start()
+    
+    def _do_emit(self):
+        """Emit the most recent pending settings"""
+        self.settings_changed.emit(self._pending)
+    
     def update_brightness(self, value):
         norm = value / 100.0
         self.settings['brightness'] = norm
         self.brightness_label.setText(f"{value}%")
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
     
     def update_contrast(self, value):
         norm = value / 100.0
         self.settings['contrast'] = norm
         self.contrast_label.setText(f"{value}%")
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
     
     def update_gamma(self, value):
         norm = value / 100.0
         self.settings['gamma'] = norm
         self.gamma_label.setText(f"{value}%")
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
     
     def update_white_balance(self, value):
         norm = value / 100.0
         self.settings['white_balance'] = norm
         self.wb_label.setText(f"{value}%")
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
     
     def update_saturation(self, value):
         norm = value / 100.0
         self.settings['saturation'] = norm
         self.saturation_label.setText(f"{value}%")
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
     
     def update_vibrance(self, value):
         norm = value / 100.0
         self.settings['vibrance'] = norm
         self.vibrance_label.setText(f"{value}%")
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
     
     def update_clahe(self, state):
         if DEBUG:
@@ -370,7 +582,11 @@ class CameraControlWidget(QWidget):
             self.clahe_on_label.show()
         else:
             self.clahe_on_label.hide()
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
+    
+    def update_clahe_tiles(self, index):
+        self.settings['clahe_tiles'] = self.CLAHE_TILE_OPTIONS[index]
+        self._schedule_emit()
     
     def reset_settings(self):
         """Reset all settings to defaults"""
@@ -381,6 +597,7 @@ class CameraControlWidget(QWidget):
         self.saturation_slider.setValue(100)
         self.vibrance_slider.setValue(0)
         self.clahe_checkbox.setChecked(False)
+        self.clahe_tiles_combo.setCurrentIndex(self.CLAHE_TILE_OPTIONS.index(8))
     
     def load_settings(self, settings_dict):
         """Load settings from dictionary"""
@@ -405,6 +622,9 @@ class CameraControlWidget(QWidget):
             self.vibrance_slider.setValue(int(settings_dict['vibrance'] * 100))
         if 'clahe_enabled' in settings_dict:
             self.clahe_checkbox.setChecked(settings_dict['clahe_enabled'])
+        if settings_dict.get('clahe_tiles') in self.CLAHE_TILE_OPTIONS:
+            self.clahe_tiles_combo.setCurrentIndex(
+                self.CLAHE_TILE_OPTIONS.index(settings_dict['clahe_tiles']))
     
     def get_settings(self):
         """Get current settings dictionary, always reflecting the UI state."""
@@ -416,27 +636,206 @@ class CameraControlWidget(QWidget):
         """Set white balance value programmatically"""
         self.wb_slider.setValue(int(value * 100))
         self.settings['white_balance'] = value
-        self.settings_changed.emit(self.get_settings())
+        self._schedule_emit()
+
+
+class PreviewWorker(QObject):
+    """Turns camera frames into preview images off the GUI thread"""
+    
+    # The image wraps a buffer that is reused for the next frame, so the
+    # worker must not get a new frame until this one is shown
+    ready = Signal(QImage)
+    
+    def __init__(self, preview_size: Tuple[int, int], is_arm: bool):
+        super().__init__()
+        self.preview_size = preview_size
+        self.is_arm = is_arm
+        self.image_processor = ImageProcessor()
+        self._preview_buffer = None
+        self._display_scaled = None
+        self._display_buffer = None
+        self._display_source = None
+        self._display_qimage = None
+    
+    @Slot(object, object, object)
+    def process(self, frame: np.ndarray, settings: FrameSettings, profile_processor):
+        """Process a camera frame and emit the preview image"""
+        image = QImage()
+        try:
+            # Downscale to preview size once so the pipeline only touches displayed pixels
+            h, w = frame.shape[:2]
+            preview_size = self.get_preview_size(w, h)
+            if preview_size[0] < w:
+                frame = cv2.resize(frame, preview_size, dst=self._preview_buffer,
+                                   interpolation=cv2.INTER_AREA)
+                self._preview_buffer = frame
+            # Apply camera profile-specific processing first (skipped when it's a no-op);
+            # it may work in place on our own preview copy, never on the raw frame
+            if profile_processor is not None:
+                in_place = frame is self._preview_buffer
+                frame = profile_processor(frame, dst=frame if in_place else None)
+            frame = self.image_processor.process_frame(frame, settings)
+            image = self.to_display(frame)
+        finally:
+            # Always answer so the GUI keeps sending frames
+            self.ready.emit(image)
+    
+    def get_preview_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Get the size a frame is shown at, fitted to the preview area"""
+        display_w, display_h = self.preview_size
+        scale = min(display_w / width, display_h / height)
+        return (int(width * scale), int(height * scale))
+    
+    def to_display(self, frame: np.ndarray) -> QImage:
+        """Convert a frame to a QImage, in RGB565 for the RK3568's 6-bit panel"""
+        # Resize frame to fit display while maintaining aspect ratio
+        # (update_frame already hands over preview-sized frames)
+        h, w = frame.shape[:2]
+        new_w, new_h = self.get_preview_size(w, h)
+        
+        # Display steps write into buffers reused across frames (OpenCV
+        # reallocates them if the preview size changes)
+        src = frame
+        if (new_w, new_h) != (w, h):
+            src = cv2.resize(frame, (new_w, new_h), dst=self._display_scaled)
+            self._display_scaled = src
+        
+        if self.is_arm:
+            # RK3568 panel: pack straight to RGB565 (5-6-5), which Qt can blit
+            # without re-packing and which is 2 instead of 3 bytes per pixel
+            display = cv2.cvtColor(src, cv2.COLOR_BGR2BGR565, dst=self._display_buffer)
+            image_format = QImage.Format_RGB16
+        elif QIMAGE_FORMAT_BGR888 is not None:
+            # 8-bit desktop display: hand BGR data to Qt as-is, with no copy or
+            # quantization pass (the worker doesn't touch it until it's shown)
+            display = src
+            image_format = QIMAGE_FORMAT_BGR888
+        else:
+            # Older Qt: convert BGR to RGB
+            display = cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._display_buffer)
+            image_format = QImage.Format_RGB888
+        
+        if display is not src:
+            self._display_buffer = display
+        
+        # Keep the QImage wrapping the displayed array (no copy); it only needs
+        # rebuilding when that array changes (new buffer or a different source)
+        if display is not self._display_source or self._display_qimage is None:
+            self._display_source = display
+            self._display_qimage = QImage(display.data, new_w, new_h,
+                                          display.strides[0], image_format)
+        return self._display_qimage
+
+
+class CaptureJobSignals(QObject):
+    """Signals for CaptureJob (QRunnable itself can't emit signals)"""
+    saved = Signal(str)
+    failed = Signal(str)
+
+
+class CaptureJob(QRunnable):
+    """Writes a captured image and its metadata on a thread pool thread"""
+    
+    # Quality 95 without the extra Huffman optimization pass, 4:2:0 chroma
+    # (the fast libjpeg-turbo path); the sampling flag needs OpenCV >= 4.5.5
+    JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 95, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+    if hasattr(cv2, 'IMWRITE_JPEG_CHROMA_QUALITY'):
+        JPEG_PARAMS += [cv2.IMWRITE_JPEG_CHROMA_QUALITY, 90]
+    if hasattr(cv2, 'IMWRITE_JPEG_SAMPLING_FACTOR'):
+        JPEG_PARAMS += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420]
+    
+    def __init__(self, frame: np.ndarray, filename: Path, metadata: Dict, metadata_file: Path):
+        super().__init__()
+        self.frame = frame
+        self.filename = filename
+        self.metadata = metadata
+        self.metadata_file = metadata_file
+        self.signals = CaptureJobSignals()
+    
+    def run(self):
+        """Encode the JPEG and save the metadata JSON"""
+        try:
+            ok, jpeg = cv2.imencode('.jpg', self.frame, self.JPEG_PARAMS)
+            if not ok:
+                raise IOError(f"could not encode {self.filename.name}")
+            self.filename.write_bytes(jpeg)
+            with open(self.metadata_file, 'w') as f:
+                json.dump(self.metadata, f, indent=2)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.saved.emit(self.filename.name)
 
 
 class AIScaleMainWindow(QMainWindow):
     """Main application window optimized for 1366x768 display"""
     
+    # Area the live preview is fitted into
+    PREVIEW_SIZE = (800, 600)
+    
+    # (frame, settings, profile processor) for the preview worker
+    preview_requested = Signal(object, object, object)
+    
+    # Camera list from a background enumeration
+    cameras_enumerated = Signal(object)
+    
+    # ScaleInterface built on a background thread (None if that failed)
+    scale_ready = Signal(object)
+    
+    CONFIG_FILE = 'config.json'
+    
+    # Scale label stylesheet per reading state
+    SCALE_STYLES = {
+        'ok': "font-weight: bold; color: #4CAF50;",
+        'idle': "font-weight: bold; color: #666;",
+        'error': "font-weight: bold; color: #f44336;",
+    }
+    
     def __init__(self):
         super().__init__()
         self.camera_backend = CameraBackend()
-        self.scale_interface = ScaleInterface()
-        self.image_processor = ImageProcessor()
+        self.scale_interface = None
+        self.image_processor = None
+        self.camera = None
+        self.camera_stream = None
+        self._last_frame_id = 0
+        self._enumerating = False
+        self._settings_loaded = False
         self.current_frame = None
+        self.preview_worker = None
+        self.preview_thread = None
+        self._preview_pending = False
         self.current_settings = {}
+        self.frame_settings = FrameSettings()
         self.current_camera_index = 0
+        self._profile_processor = None
+        
+        # In-memory copy of config.json, read now so nothing saved before the
+        # controls are restored can drop the user's values; changes are
+        # written out in one go once the controls have been still for a
+        # moment (and on close)
+        self._config_cache = self._read_config()
+        self._config_dirty = False
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(500)
+        self._save_timer.timeout.connect(self._flush_config)
         
         self.init_ui()
-        self.init_camera()
         self.init_timer()
         
-        # Load saved settings
-        self.load_settings()
+        # Let Qt paint the window before the slow start-up work (JIT warm-up,
+        # serial scale detection, OpenCV/V4L2 camera probe) runs
+        QTimer.singleShot(0, self.deferred_init)
+    
+    def deferred_init(self):
+        """Initialize hardware and processing once the event loop is running"""
+        self.image_processor = ImageProcessor()
+        self.init_preview_worker()
+        self.init_scale()
+        # Saved settings are loaded once the first camera is up (see
+        # on_cameras_enumerated) so they override its profile defaults
+        self.init_camera()
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -470,7 +869,7 @@ class AIScaleMainWindow(QMainWindow):
         self.camera_combo.currentIndexChanged.connect(self.change_camera)
         camera_layout.addWidget(self.camera_combo)
 
-        refresh_btn = QPushButton("Refresh")
+        self.refresh_btn = refresh_btn = QPushButton("Refresh")
         refresh_btn.setMinimumHeight(32)
         refresh_btn.setMaximumWidth(110)
         refresh_btn.setStyleSheet("""
@@ -541,7 +940,8 @@ class AIScaleMainWindow(QMainWindow):
         
         # Scale reading display
         self.scale_label = QLabel("Scale: Not connected")
-        self.scale_label.setStyleSheet("font-weight: bold; color: #666;")
+        self.scale_label.setStyleSheet(self.SCALE_STYLES['idle'])
+        self._scale_style_state = 'idle'
         controls_layout.addWidget(self.scale_label)
         
         controls_layout.addStretch()
@@ -656,10 +1056,39 @@ class AIScaleMainWindow(QMainWindow):
         """)
     
     def init_camera(self):
-        """Initialize camera system"""
+        """Initialize camera system (the first camera is opened once found)"""
+        self.cameras_enumerated.connect(self.on_cameras_enumerated, Qt.QueuedConnection)
         self.refresh_cameras()
-        if self.camera_combo.count() > 0:
-            self.change_camera(0)
+    
+    def init_scale(self):
+        """Connect to the scale on a background thread (port auto-detection is slow)"""
+        self.scale_ready.connect(self.on_scale_ready, Qt.QueuedConnection)
+        self.set_scale_status("Scale: Connecting...", 'idle')
+        
+        def run():
+            scale = None
+            try:
+                scale = ScaleInterface()
+            except Exception as e:
+                print(f"Scale initialization failed: {e}")
+            self.scale_ready.emit(scale)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def on_scale_ready(self, scale):
+        """Take over the ScaleInterface built by init_scale"""
+        self.scale_interface = scale
+        if scale is None:
+            self.set_scale_status("Scale: Not connected", 'error')
+    
+    def init_preview_worker(self):
+        """Start the background thread that renders preview frames"""
+        self.preview_thread = QThread(self)
+        self.preview_worker = PreviewWorker(self.PREVIEW_SIZE, self.camera_backend.is_arm)
+        self.preview_worker.moveToThread(self.preview_thread)
+        self.preview_requested.connect(self.preview_worker.process, Qt.QueuedConnection)
+        self.preview_worker.ready.connect(self.show_preview, Qt.QueuedConnection)
+        self.preview_thread.start()
     
     def init_timer(self):
         """Initialize update timer"""
@@ -668,23 +1097,59 @@ class AIScaleMainWindow(QMainWindow):
         self.timer.start(33)  # ~30 FPS
     
     def refresh_cameras(self):
-        """Refresh available cameras"""
+        """Refresh available cameras (enumerates in the background)"""
+        if self._enumerating:
+            return
+        self._enumerating = True
+        self.refresh_btn.setEnabled(False)
+        self.camera_combo.setEnabled(False)
+        self.status_bar.showMessage("Searching for cameras...")
+        # An open camera can't be probed, so let go of it while enumerating
+        self.release_camera()
+        self.camera_backend.invalidate_usb_cache()
+        self.camera_backend.enumerate_cameras_async(self.cameras_enumerated.emit)
+    
+    def on_cameras_enumerated(self, cameras):
+        """Fill the camera list from a finished enumeration and open the first camera"""
+        self._enumerating = False
+        self.refresh_btn.setEnabled(True)
+        self.camera_combo.setEnabled(True)
+        
+        self.camera_combo.blockSignals(True)
         self.camera_combo.clear()
-        cameras = self.camera_backend.enumerate_cameras()
-        for i, camera in enumerate(cameras):
-            self.camera_combo.addItem(f"Camera {i}: {camera.get('name', 'Unknown')}")
+        # The list can skip /dev/video nodes (metadata, M2M), so each entry
+        # carries the device index to open rather than relying on its position
+        for camera in cameras:
+            self.camera_combo.addItem(f"Camera {camera['index']}: {camera.get('name', 'Unknown')}",
+                                      camera['index'])
+        self.camera_combo.blockSignals(False)
+        
+        if cameras:
+            self.change_camera(0)
+        else:
+            self.status_bar.showMessage("No cameras found")
+            self.camera_info_label.setText("Camera: Not connected")
+        
+        if not self._settings_loaded:
+            self._settings_loaded = True
+            self.load_settings()
     
-    def change_camera(self, index):
-        """Change active camera"""
-        if hasattr(self, 'camera') and self.camera:
-            self.camera.release()
+    def change_camera(self, combo_index):
+        """Change active camera to the one at combo_index in the camera list"""
+        index = self.camera_combo.itemData(combo_index)
+        if index is None:
+            return
+        self.release_camera()
         
         try:
             self.current_camera_index = index
+            self._profile_processor = self.camera_backend.make_profile_processor(index)
             self.camera = self.camera_backend.create_capture(index)
             if self.camera:
-                # Get camera profile if available
+                # Get camera profile if available (create_capture has already
+                # applied its pixel format and buffer size)
                 profile = self.camera_backend.get_camera_profile(index)
+                
                 if profile:
                     # Set optimal resolution based on profile
                     optimal_res = profile.get_optimal_resolution(1366)  # Target width for RK3568
@@ -707,7 +1172,8 @@ class AIScaleMainWindow(QMainWindow):
                         f"Focus: {sensor_info.get('focus', 'Unknown')}",
                         f"IR Filter: {'Yes' if sensor_info.get('ir_filter', False) else 'No'}",
                         f"Max: {max_res[0]}×{max_res[1]}",
-                        f"Current: {optimal_res[0]}×{optimal_res[1]}"
+                        f"Current: {optimal_res[0]}×{optimal_res[1]}",
+                        f"Format: {self.camera_backend.get_fourcc(self.camera)}"
                     ]
                     
                     self.camera_info_label.setText(" | ".join(camera_details))
@@ -722,7 +1188,14 @@ class AIScaleMainWindow(QMainWindow):
                     self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
                     self.camera.set(cv2.CAP_PROP_FPS, 30)
                     self.status_bar.showMessage(f"Camera {index} connected")
-                    self.camera_info_label.setText(f"Camera: Generic USB Camera | Current: 1280×720")
+                    self.camera_info_label.setText(
+                        f"Camera: Generic USB Camera | Current: 1280×720 | "
+                        f"Format: {self.camera_backend.get_fourcc(self.camera)}")
+                
+                # Configuration is done; from here on a reader thread owns the capture
+                self.camera_stream = LatestFrameCapture(
+                    self.camera, self.camera_backend.make_frame_converter(self.camera))
+                self.camera_stream.start()
             else:
                 self.status_bar.showMessage("Failed to connect camera")
                 self.camera_info_label.setText("Camera: Not connected")
@@ -731,80 +1204,79 @@ class AIScaleMainWindow(QMainWindow):
             self.camera = None
             self.camera_info_label.setText("Camera: Error connecting")
     
+    def release_camera(self):
+        """Stop the frame reader and release the active camera"""
+        if self.camera_stream:
+            self.camera_stream.release()
+        elif self.camera:
+            self.camera.release()
+        self.camera_stream = None
+        self.camera = None
+        self._last_frame_id = 0
+    
     def update_image_settings(self, settings):
         """Update image processing settings"""
-        self.current_settings = self.control_panel.get_settings()
-        self.update_frame()
+        # The frame timer picks up the new settings on its next tick
+        self.current_settings = settings
+        self.frame_settings = FrameSettings.from_dict(settings)
+        self.save_settings()
     
     def update_frame(self):
         """Update camera frame"""
-        if not self.camera:
+        if not self.camera_stream:
             return
-        ret, frame = self.camera.read()
-        if not ret or frame is None:
+        # Newest frame from the reader thread; never blocks on the camera
+        frame_id, frame = self.camera_stream.latest()
+        if frame is None or frame_id == self._last_frame_id:
             return
-        # Apply camera profile-specific processing first
-        frame = self.camera_backend.apply_profile_image_processing(frame, self.current_camera_index)
-        # Always fetch the latest settings from the control panel
-        settings = self.control_panel.get_settings()
-        if DEBUG:
-            print(f"[DEBUG] update_frame using settings: {settings}")
-        frame = self.image_processor.process_frame(frame, settings)
+        self._last_frame_id = frame_id
+        # Keep the raw full-resolution frame; capture_image processes it on demand
         self.current_frame = frame
-        # Convert to Qt format and display
-        self.display_frame(frame)
+        # Hand the frame to the preview worker unless it's still busy with the
+        # previous one (dropping frames keeps the preview from lagging behind).
+        # The settings snapshot is kept current by update_image_settings.
+        if self.preview_worker is not None and not self._preview_pending:
+            if DEBUG:
+                print(f"[DEBUG] update_frame using settings: {self.frame_settings}")
+            self._preview_pending = True
+            self.preview_requested.emit(frame, self.frame_settings, self._profile_processor)
         # Update scale reading
         self.update_scale_reading()
     
-    def display_frame(self, frame):
-        """Display frame with 6-bit color optimization for RK3568 displays"""
-        if frame is None:
+    def show_preview(self, image: QImage):
+        """Show a preview image rendered by the preview worker"""
+        # The worker can take the next frame once this one is on screen
+        self._preview_pending = False
+        if image.isNull():
             return
-        
-        # Resize frame to fit display while maintaining aspect ratio
-        h, w = frame.shape[:2]
-        display_w, display_h = 800, 600
-        
-        # Calculate scaling to fit
-        scale = min(display_w / w, display_h / h)
-        new_w, new_h = int(w * scale), int(h * scale)
-        
-        frame_resized = cv2.resize(frame, (new_w, new_h))
-        
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-        
-        # 6-bit color optimization for RK3568 displays (64 levels per channel)
-        # This reduces color depth to match the 6-bit display capabilities
-        frame_6bit = (frame_rgb >> 2) << 2  # Simple bit shift for 6-bit quantization
-        
-        # Convert to QImage
-        h, w, ch = frame_6bit.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(frame_6bit.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        
-        # Convert to QPixmap and display
-        pixmap = QPixmap.fromImage(qt_image)
-        self.camera_label.setPixmap(pixmap)
+        self.camera_label.setPixmap(QPixmap.fromImage(image))
     
     def update_scale_reading(self):
         """Update scale reading display"""
         if not SCALE_AVAILABLE:
-            self.scale_label.setText("Scale: Not available (pyserial not installed)")
-            self.scale_label.setStyleSheet("font-weight: bold; color: #f44336;")
+            self.set_scale_status("Scale: Not available (pyserial not installed)", 'error')
+            return
+        if self.scale_interface is None:
+            # Still connecting (init_scale) or it failed; on_scale_ready set the label
             return
             
         try:
             reading = self.scale_interface.get_reading()
             if reading:
-                self.scale_label.setText(f"Scale: {reading.weight:.2f} {reading.unit}")
-                self.scale_label.setStyleSheet("font-weight: bold; color: #4CAF50;")
+                self.set_scale_status(f"Scale: {reading.weight:.2f} {reading.unit}", 'ok')
             else:
-                self.scale_label.setText("Scale: No reading")
-                self.scale_label.setStyleSheet("font-weight: bold; color: #666;")
+                self.set_scale_status("Scale: No reading", 'idle')
         except:
-            self.scale_label.setText("Scale: Not connected")
-            self.scale_label.setStyleSheet("font-weight: bold; color: #f44336;")
+            self.set_scale_status("Scale: Not connected", 'error')
+    
+    def set_scale_status(self, text: str, state: str):
+        """Update the scale label, touching Qt only for what actually changed"""
+        # Called every frame; restyling re-resolves the widget's style sheet
+        if text != self.scale_label.text():
+            self.scale_label.setText(text)
+        if state != self._scale_style_state:
+            self.scale_label.setStyleSheet(self.SCALE_STYLES[state])
+            self._scale_style_state = state
     
     def capture_image(self):
         """Capture and save image at full resolution"""
@@ -822,20 +1294,19 @@ class AIScaleMainWindow(QMainWindow):
         
         # Get scale reading
         scale_reading = None
-        try:
-            scale_reading = self.scale_interface.get_reading()
-        except:
-            pass
+        if self.scale_interface is not None:
+            try:
+                scale_reading = self.scale_interface.get_reading()
+            except:
+                pass
         
         # Process full resolution frame with camera profile processing
-        processed_frame = self.camera_backend.apply_profile_image_processing(
-            self.current_frame, self.current_camera_index)
-        processed_frame = self.image_processor.process_frame(processed_frame, self.current_settings)
-        
-        # Save image
-        cv2.imwrite(str(filename), processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        processed_frame = self.current_frame
+        if self._profile_processor is not None:
+            processed_frame = self._profile_processor(processed_frame)
+        processed_frame = self.image_processor.process_frame(processed_frame, self.frame_settings)
         
-        # Save metadata
+        # Metadata saved next to the image
         metadata = {
             "timestamp": timestamp,
             "filename": filename.name,
@@ -845,49 +1316,77 @@ class AIScaleMainWindow(QMainWindow):
                 "unit": scale_reading.unit if scale_reading else None
             } if scale_reading else None
         }
-        
         metadata_file = data_dir / f"capture_{timestamp}.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
         
-        self.status_bar.showMessage(f"Image saved: {filename.name}")
-        QMessageBox.information(self, "Success", f"Image captured and saved as {filename.name}")
+        # Encode and write in the background; only the processor's reusable
+        # buffers get overwritten, so the job needs its own copy of those alone
+        if self.image_processor.owns_buffer(processed_frame):
+            processed_frame = processed_frame.copy()
+        job = CaptureJob(processed_frame, filename, metadata, metadata_file)
+        job.signals.saved.connect(self.capture_saved)
+        job.signals.failed.connect(self.capture_failed)
+        QThreadPool.globalInstance().start(job)
+        self.status_bar.showMessage(f"Saving {filename.name}...")
     
-    def load_settings(self):
-        """Load settings from config file"""
+    def capture_saved(self, name: str):
+        """Report a capture that finished writing"""
+        self.status_bar.showMessage(f"Image saved: {name}")
+        QMessageBox.information(self, "Success", f"Image captured and saved as {name}")
+    
+    def capture_failed(self, message: str):
+        """Report a capture that could not be written"""
+        self.status_bar.showMessage(f"Capture failed: {message}")
+        QMessageBox.warning(self, "Error", f"Failed to save capture: {message}")
+    
+    def _read_config(self) -> dict:
+        """Read the config file, empty if it is missing or unreadable"""
         try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-                # Load camera controls if they exist
-                if 'camera_controls' in config:
-                    self.control_panel.load_settings(config['camera_controls'])
-                    # Initialize current_settings with loaded values
-                    self.current_settings = self.control_panel.get_settings()
+            with open(self.CONFIG_FILE, 'r') as f:
+                return json.load(f)
         except Exception as e:
             print(f"Error loading settings: {e}")
-            # Initialize with default settings
-            self.current_settings = self.control_panel.get_settings()
+            return {}
+    
+    def load_settings(self):
+        """Apply the saved settings from the config file to the controls"""
+        # Load camera controls if they exist
+        if 'camera_controls' in self._config_cache:
+            self.control_panel.load_settings(self._config_cache['camera_controls'])
+        # Initialize current_settings with loaded (or default) values
+        self.current_settings = self.control_panel.get_settings()
+        self.frame_settings = FrameSettings.from_dict(self.current_settings)
     
     def save_settings(self):
-        """Save current settings to config file"""
+        """Record current settings and schedule a write to the config file"""
+        # Until the saved settings are applied the controls hold defaults
+        if not self._settings_loaded:
+            return
+        self._config_cache['camera_controls'] = self.control_panel.get_settings()
+        self._config_dirty = True
+        self._save_timer.start()
+    
+    def _flush_config(self):
+        """Write the cached config to disk if it changed (atomic replace)"""
+        if not self._config_dirty:
+            return
         try:
-            config = {}
-            if os.path.exists('config.json'):
-                with open('config.json', 'r') as f:
-                    config = json.load(f)
-            
-            config['camera_controls'] = self.control_panel.get_settings()
-            
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            tmp_path = self.CONFIG_FILE + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._config_cache, f, indent=2)
+            os.replace(tmp_path, self.CONFIG_FILE)
+            self._config_dirty = False
         except:
             pass
     
     def closeEvent(self, event):
         """Handle application close"""
-        if hasattr(self, 'camera') and self.camera:
-            self.camera.release()
+        self.release_camera()
+        if self.preview_thread is not None:
+            self.preview_thread.quit()
+            self.preview_thread.wait()
         self.save_settings()
+        self._save_timer.stop()
+        self._flush_config()
         event.accept()
 
 
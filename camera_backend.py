@@ -5,16 +5,109 @@ import subprocess
 import re
 import json
 import os
-from typing import List, Dict, Optional, Tuple, Any
+import time
+import ctypes
+import ctypes.util
+from typing import List, Dict, Optional, Tuple, Any, Callable
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import fcntl
+    V4L2_IOCTL_AVAILABLE = True
+except ImportError:
+    V4L2_IOCTL_AVAILABLE = False
+
+try:
+    # macOS only (pyobjc-framework-AVFoundation / -CoreMedia)
+    import AVFoundation
+    import CoreMedia
+    AVFOUNDATION_AVAILABLE = True
+except ImportError:
+    AVFOUNDATION_AVAILABLE = False
+
+def _load_libyuv():
+    """Load libyuv's NEON/SSE YUY2 to ARGB converter, None if unavailable"""
+    path = ctypes.util.find_library('yuv')
+    if not path:
+        return None
+    try:
+        lib = ctypes.CDLL(path)
+        lib.YUY2ToARGB.argtypes = [ctypes.c_void_p, ctypes.c_int,
+                                   ctypes.c_void_p, ctypes.c_int,
+                                   ctypes.c_int, ctypes.c_int]
+        lib.YUY2ToARGB.restype = ctypes.c_int
+        return lib
+    except (OSError, AttributeError):
+        return None
+
+_LIBYUV = _load_libyuv()
+LIBYUV_AVAILABLE = _LIBYUV is not None
+
 # Suppress OpenCV warnings during camera enumeration
 os.environ['OPENCV_VIDEOIO_DEBUG'] = '0'
 os.environ['OPENCV_VIDEOIO_PRIORITY_MSMF'] = '0'
 
 logger = logging.getLogger(__name__)
 
+# Patterns used during camera enumeration, compiled once at import
+_V4L2_FRAMESIZE_RE = re.compile(r'Size: Discrete (\d+)x(\d+)')
+_GSTREAMER_BUILD_RE = re.compile(r'GStreamer:\s*YES')
+
+# Known cameras in `lsusb -v` output: the "ID vvvv:pppp" header, or the
+# idVendor/idProduct lines of the device descriptor
+_USB_PATTERNS = {
+    'arducam_b0196': re.compile(r'0bda:5830|idvendor\s+0x0bda\b[^\n]*\n\s*idproduct\s+0x5830', re.I),
+    'jsk_s8130_v3': re.compile(r'1bcf:2c99|idvendor\s+0x1bcf\b[^\n]*\n\s*idproduct\s+0x2c99', re.I),
+}
+
+# V4L2 device capability and format queries (linux/videodev2.h)
+VIDIOC_QUERYCAP = 0x80685600
+VIDIOC_ENUM_FMT = 0xc0405602
+VIDIOC_ENUM_FRAMESIZES = 0xc02c564a
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_FRMSIZE_TYPE_DISCRETE = 1
+
+class V4L2Capability(ctypes.Structure):
+    """struct v4l2_capability"""
+    _fields_ = [
+        ('driver', ctypes.c_char * 16),
+        ('card', ctypes.c_char * 32),
+        ('bus_info', ctypes.c_char * 32),
+        ('version', ctypes.c_uint32),
+        ('capabilities', ctypes.c_uint32),
+        ('device_caps', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 3),
+    ]
+
+class V4L2FmtDesc(ctypes.Structure):
+    """struct v4l2_fmtdesc"""
+    _fields_ = [
+        ('index', ctypes.c_uint32),
+        ('type', ctypes.c_uint32),
+        ('flags', ctypes.c_uint32),
+        ('description', ctypes.c_char * 32),
+        ('pixelformat', ctypes.c_uint32),
+        ('mbus_code', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 3),
+    ]
+
+class V4L2FrmSizeEnum(ctypes.Structure):
+    """struct v4l2_frmsizeenum (discrete sizes; stepwise shares the union's first fields)"""
+    _fields_ = [
+        ('index', ctypes.c_uint32),
+        ('pixel_format', ctypes.c_uint32),
+        ('type', ctypes.c_uint32),
+        ('width', ctypes.c_uint32),
+        ('height', ctypes.c_uint32),
+        ('stepwise_rest', ctypes.c_uint32 * 4),
+        ('reserved', ctypes.c_uint32 * 2),
+    ]
+
 class CameraProfile:
     """Camera profile with optimal settings and specifications"""
     
@@ -28,6 +121,10 @@ class CameraProfile:
         self.optimal_settings = profile_data.get('optimal_settings', {})
         self.image_processing = profile_data.get('image_processing', {})
         self.features = profile_data.get('features', [])
+        
+        # Image processing parameters resolved once instead of per frame
+        self.gamma_correction = float(self.image_processing.get('gamma_correction', 1.0))
+        self.denoise_strength = float(self.image_processing.get('denoise_strength', 0.0))
     
     def get_optimal_resolution(self, target_width: int = 1920) -> Tuple[int, int]:
         """Get optimal resolution based on target width"""
@@ -44,15 +141,158 @@ class CameraProfile:
         max_res = self.sensor.get('max_resolution', {})
         return (max_res.get('width', 1920), max_res.get('height', 1080))
 
+def convert_yuy2_to_bgr(src: np.ndarray, width: int, height: int,
+                        dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert a raw YUY2 (YUYV) frame to BGR, with libyuv when available"""
+    yuy2 = np.ascontiguousarray(src).reshape(height, width, 2)
+    if not LIBYUV_AVAILABLE:
+        return cv2.cvtColor(yuy2, cv2.COLOR_YUV2BGR_YUY2, dst=dst)
+    # libyuv "ARGB" is B, G, R, A in memory, i.e. OpenCV's BGRA
+    bgra = np.empty((height, width, 4), dtype=np.uint8)
+    if _LIBYUV.YUY2ToARGB(yuy2.ctypes.data, width * 2, bgra.ctypes.data, width * 4,
+                          width, height) != 0:
+        return cv2.cvtColor(yuy2, cv2.COLOR_YUV2BGR_YUY2, dst=dst)
+    return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=dst)
+
+class LatestFrameCapture:
+    """Reads a capture on a background thread, keeping only the newest frame
+    
+    Consumers never block on the driver and never see a backlog of stale
+    frames. Configure the capture before start(); VideoCapture isn't safe to
+    use from two threads at once.
+    """
+    
+    def __init__(self, cap: cv2.VideoCapture,
+                 convert: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        self.cap = cap
+        self.convert = convert
+        self._lock = threading.Condition()
+        self._latest: Optional[np.ndarray] = None
+        self._frame_id = 0
+        self._running = False
+        self._release_on_exit = False
+        self._reader_exited = True
+        self._thread = None
+    
+    def start(self):
+        """Start the reader thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._reader_exited = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+    
+    def _loop(self):
+        """Read frames continuously, replacing the previous one"""
+        try:
+            while self._running:
+                ret, frame = self.cap.read()
+                if not ret or frame is None:
+                    time.sleep(0.01)
+                    continue
+                if self.convert is not None:
+                    frame = self.convert(frame)
+                # read() allocates a new array each time, so consumers can hold
+                # on to a published frame without copying it
+                with self._lock:
+                    self._latest = frame
+                    self._frame_id += 1
+                    self._lock.notify_all()
+        finally:
+            # release() may have stopped waiting while read() was still blocked
+            with self._lock:
+                self._reader_exited = True
+                if self._release_on_exit:
+                    self.cap.release()
+    
+    def latest(self, timeout: float = 0.0) -> Tuple[int, Optional[np.ndarray]]:
+        """Get (frame_id, frame) of the newest frame, waiting up to timeout for the first
+        
+        frame_id increases with every new frame, so callers can skip a frame
+        they have already handled. Returns (0, None) before any frame arrives.
+        """
+        with self._lock:
+            if self._latest is None and timeout > 0:
+                self._lock.wait_for(lambda: self._latest is not None, timeout)
+            if self._latest is None:
+                return 0, None
+            return self._frame_id, self._latest
+    
+    def stop(self):
+        """Stop the reader thread (it may outlive this call if read() is blocked)"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1)
+            if not self._thread.is_alive():
+                self._thread = None
+    
+    def release(self):
+        """Stop reading and release the capture
+        
+        While the reader thread runs it releases the capture itself on its way
+        out, so a read() blocked on a stalled camera is never released under.
+        """
+        with self._lock:
+            self._release_on_exit = True
+            reader_releases = not self._reader_exited
+        self.stop()
+        if not reader_releases:
+            self.cap.release()
+
 class CameraBackend:
     """Hardware abstraction layer for camera access across different platforms"""
     
+    # Human-readable names of the OpenCV capture backends
+    _BACKEND_NAMES = {
+        cv2.CAP_AVFOUNDATION: "AVFoundation",
+        cv2.CAP_V4L2: "V4L2",
+        cv2.CAP_DSHOW: "DirectShow",
+        cv2.CAP_ANDROID: "Android",
+        cv2.CAP_ANY: "Auto"
+    }
+    
+    # OpenCV worker threads on ARM boards, leaving cores for Qt and capture
+    ARM_OPENCV_THREADS = 2
+    
+    # Most devices probed at once during enumeration (one thread each)
+    MAX_PROBE_THREADS = 4
+    
+    # Indices tried when devices can't be listed
+    PROBE_INDEX_COUNT = 10
+    
+    # Supported resolutions per V4L2 device, kept across runs
+    CAPS_CACHE_PATH = Path.home() / '.cache' / 'aiscale' / 'cam_caps.json'
+    
+    # MJPEG capture with JPEG decode on the Rockchip VPU (MPP) instead of the CPU
+    MPP_MJPEG_PIPELINE = (
+        "v4l2src device=/dev/video{index}{controls} ! "
+        "image/jpeg,width={width},height={height},framerate=(fraction)[1/1,{fps}/1] ! "
+        "mppjpegdec ! videoconvert ! video/x-raw,format=BGR ! appsink drop=1 max-buffers=1"
+    )
+    
+    # Frame rate cap for embedded (ARM Linux) captures
+    ARM_CAPTURE_FPS = 30
+    
+    # Profile camera controls v4l2src can set through extra-controls, by their
+    # V4L2 control names; others (gain, exposure) need the OpenCV V4L2 path
+    _MPP_CONTROLS = ('brightness', 'contrast', 'saturation')
+    
     def __init__(self):
         self.platform = platform.system().lower()
         self.is_arm = platform.machine().lower() in ['aarch64', 'arm64', 'armv7l', 'armv8']
         self.backend = self._get_backend()
         self.profiles = self._load_camera_profiles()
         self.detected_cameras = {}
+        self._gamma_cache: Dict[float, np.ndarray] = {}
+        self._configure_opencv_runtime()
+        self.use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        self.has_gstreamer = self._has_gstreamer()
+        self._usb_scan_done = False
+        self._usb_scan_cache: Optional[str] = None
+        self._res_cache: Dict[int, List[Tuple[int, int]]] = {}
+        self._caps_cache: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        self._caps_lock = threading.Lock()
         
     def _get_backend(self) -> int:
         """Determine the appropriate camera backend based on platform"""
@@ -74,6 +314,24 @@ class CameraBackend:
             # Default fallback
             return cv2.CAP_ANY
     
+    def _configure_opencv_runtime(self):
+        """Tune OpenCV's thread pool and OpenCL dispatch for the host platform"""
+        if self.is_arm and self.platform == 'linux':
+            # The RK3568 has four A55 cores shared with the Qt GUI thread, the
+            # preview worker and the capture reader; a full-width pool thrashes
+            cv2.setNumThreads(self.ARM_OPENCV_THREADS)
+        elif self.platform == 'darwin':
+            # Round-trips to a discrete GPU cost more than the small
+            # conversions we run, so keep every UMat op on the CPU
+            cv2.ocl.setUseOpenCL(False)
+    
+    def _has_gstreamer(self) -> bool:
+        """Check whether OpenCV was built with the GStreamer video backend"""
+        try:
+            return bool(_GSTREAMER_BUILD_RE.search(cv2.getBuildInformation()))
+        except Exception:
+            return False
+    
     def _load_camera_profiles(self) -> Dict[str, CameraProfile]:
         """Load camera profiles from JSON file"""
         profiles = {}
@@ -92,26 +350,34 @@ class CameraBackend:
         
         return profiles
     
+    def invalidate_usb_cache(self):
+        """Forget the cached USB scan so the next detection re-queries the bus"""
+        self._usb_scan_done = False
+        self._usb_scan_cache = None
+    
     def _detect_usb_camera(self, device_path: str = None) -> Optional[str]:
-        """Detect USB camera model by VID/PID"""
+        """Detect USB camera model by VID/PID (scans the bus once until invalidated)"""
+        if self._usb_scan_done:
+            return self._usb_scan_cache
+        
         profile_key = None
         
         try:
             if self.platform == 'linux':
-                # Use lsusb to get USB device info
-                result = subprocess.run(['lsusb', '-v'], capture_output=True, text=True)
-                if result.returncode == 0:
-                    # Parse for known VID/PID combinations using patterns from profiles
-                    usb_output = result.stdout.lower()
-                    
-                    # Check for Arducam B0196 patterns
-                    if any(pattern in usb_output for pattern in ['0bda:5830', 'idvendor.*0x0bda.*idproduct.*0x5830']):
-                        profile_key = 'arducam_b0196'
-                        logger.info("Detected Arducam B0196 camera via USB VID/PID")
-                    # Check for JSK-S8130-V3.0 patterns
-                    elif any(pattern in usb_output for pattern in ['1bcf:2c99', 'idvendor.*0x1bcf.*idproduct.*0x2c99']):
-                        profile_key = 'jsk_s8130_v3'
-                        logger.info("Detected JSK-S8130-V3.0 camera via USB VID/PID")
+                # sysfs lists every device's VID/PID without spawning a process;
+                # lsusb -v (which also reads every descriptor) is the fallback
+                usb_ids = self._read_sysfs_usb_ids()
+                if usb_ids is None:
+                    result = subprocess.run(['lsusb', '-v'], capture_output=True, text=True)
+                    if result.returncode == 0:
+                        usb_ids = result.stdout
+                if usb_ids:
+                    # Parse for known VID/PID combinations
+                    for key, pattern in _USB_PATTERNS.items():
+                        if pattern.search(usb_ids):
+                            profile_key = key
+                            logger.info(f"Detected {key} camera via USB VID/PID")
+                            break
             
             elif self.platform == 'darwin':
                 # Use system_profiler on macOS
@@ -150,134 +416,408 @@ class CameraBackend:
         else:
             logger.debug("No specific camera model detected, using generic profile")
         
+        self._usb_scan_cache = profile_key
+        self._usb_scan_done = True
         return profile_key
     
-    def enumerate_cameras(self) -> List[Dict[str, any]]:
-        """Enumerate available cameras with platform-specific methods"""
+    def enumerate_cameras(self, probe_resolutions: bool = False) -> List[Dict[str, any]]:
+        """Enumerate available cameras with platform-specific methods
+        
+        Supported resolutions are only listed (as 'resolutions') when
+        probe_resolutions is set; otherwise use get_resolutions() on demand.
+        """
         cameras = []
+        # Indices may now refer to different devices
+        self._res_cache.clear()
         
         if self.platform == 'linux':
-            cameras = self._enumerate_linux_cameras()
+            cameras = self._enumerate_linux_cameras(probe_resolutions)
         else:
             # Fallback to index-based enumeration
-            cameras = self._enumerate_by_index()
+            cameras = self._enumerate_by_index(probe_resolutions)
             
         return cameras
     
-    def _enumerate_linux_cameras(self) -> List[Dict[str, any]]:
+    def enumerate_cameras_async(self, on_done: Callable[[List[Dict[str, any]]], None],
+                                probe_resolutions: bool = False) -> threading.Thread:
+        """Enumerate cameras on a background thread, then call on_done(cameras)
+        
+        on_done runs on that thread; GUI callers should hand the result over
+        with a queued signal.
+        """
+        def run():
+            cameras = []
+            try:
+                cameras = self.enumerate_cameras(probe_resolutions)
+            except Exception as e:
+                logger.error(f"Camera enumeration failed: {e}")
+            on_done(cameras)
+        
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+    
+    def _enumerate_linux_cameras(self, probe_resolutions: bool = False) -> List[Dict[str, any]]:
         """Linux-specific camera enumeration using V4L2"""
         cameras = []
         
         try:
-            # List all video devices
-            import glob
-            import os
+            video_devices = self._list_video_devices()
             
-            video_devices = glob.glob('/dev/video*')
+            # Scan USB once up front rather than racing to do it from every probe
+            profile_key = self._detect_usb_camera()
             
-            for device in sorted(video_devices):
-                try:
-                    # Get device info using v4l2-ctl if available
-                    device_num = int(re.search(r'/dev/video(\d+)', device).group(1))
-                    
-                    # Try to get device name
-                    name = f"Camera {device_num}"
-                    try:
-                        result = subprocess.run(
-                            ['v4l2-ctl', '-d', device, '--info'],
-                            capture_output=True, text=True, timeout=1
-                        )
-                        if result.returncode == 0:
-                            for line in result.stdout.split('\n'):
-                                if 'Card type' in line:
-                                    name = line.split(':', 1)[1].strip()
-                                    break
-                    except:
-                        pass
-                    
-                    # Test if camera is usable
-                    cap = cv2.VideoCapture(device_num, self.backend)
-                    if cap.isOpened():
-                        # Get supported resolutions
-                        resolutions = self._get_supported_resolutions(cap)
-                        cap.release()
-                        
-                        # Try to detect camera model
-                        profile_key = self._detect_usb_camera(device)
-                        camera_profile = self.profiles.get(profile_key, self.profiles.get('generic'))
-                        
-                        camera_info = {
-                            'index': device_num,
-                            'name': name,
-                            'device': device,
-                            'resolutions': resolutions,
-                            'backend': 'V4L2',
-                            'profile_key': profile_key or 'generic',
-                            'profile': camera_profile
-                        }
-                        
-                        if camera_profile and profile_key:
-                            camera_info['name'] = camera_profile.name
-                            camera_info['model'] = camera_profile.model
-                            self.detected_cameras[device_num] = camera_profile
-                        
-                        cameras.append(camera_info)
-                except Exception as e:
-                    logger.debug(f"Error checking device {device}: {e}")
+            # Opening a device blocks in the driver (with the GIL released), so
+            # probe several nodes at once; map() keeps the device order
+            if video_devices:
+                workers = min(len(video_devices), self.MAX_PROBE_THREADS)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = pool.map(lambda device: self._probe_linux_device(device, probe_resolutions),
+                                       video_devices)
+                    cameras = [camera for camera in results if camera is not None]
+            
+            self._register_detected(cameras, profile_key)
                     
         except Exception as e:
             logger.error(f"Error enumerating Linux cameras: {e}")
             
         # If no cameras found, try index-based enumeration
         if not cameras:
-            cameras = self._enumerate_by_index()
+            cameras = self._enumerate_by_index(probe_resolutions)
             
         return cameras
     
-    def _enumerate_by_index(self) -> List[Dict[str, any]]:
+    def _list_video_devices(self) -> List[str]:
+        """List /dev/video* nodes via sysfs (no device is opened), in index order"""
+        try:
+            names = os.listdir('/sys/class/video4linux')
+        except OSError:
+            import glob
+            names = [os.path.basename(device) for device in glob.glob('/dev/video*')]
+        # Only videoN nodes (not e.g. v4l-subdev or a stray videoN.bak)
+        numbers = sorted(int(name[5:]) for name in names
+                         if name.startswith('video') and name[5:].isdigit())
+        return [f'/dev/video{number}' for number in numbers]
+    
+    def _read_sysfs_usb_ids(self) -> Optional[str]:
+        """List attached USB devices as 'vid:pid' lines from sysfs, None without sysfs"""
+        root = Path('/sys/bus/usb/devices')
+        if not root.is_dir():
+            return None
+        ids = []
+        for dev in root.iterdir():
+            vid = self._read_sysfs(str(dev / 'idVendor'))
+            pid = self._read_sysfs(str(dev / 'idProduct'))
+            if vid and pid:
+                ids.append(f"{vid}:{pid}")
+        return '\n'.join(ids)
+    
+    def _read_sysfs(self, path: str) -> Optional[str]:
+        """Read a sysfs attribute, None if it doesn't exist"""
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    def _probe_linux_device(self, device: str, probe_resolutions: bool) -> Optional[Dict[str, any]]:
+        """Check whether a /dev/video node is a usable camera and describe it"""
+        try:
+            device_num = int(device[len('/dev/video'):])
+            
+            sysfs_dir = f'/sys/class/video4linux/video{device_num}'
+            
+            # Ask the driver directly; metadata and M2M nodes can't
+            # capture video, so don't make OpenCV open them
+            v4l2_cap = self._query_v4l2_cap(device)
+            if v4l2_cap is not None:
+                if not v4l2_cap['capture']:
+                    return None
+            elif self._read_sysfs(f'{sysfs_dir}/index') not in (None, '0'):
+                # Without the ioctl: UVC puts the capture node first (index 0)
+                # and its metadata node after it
+                return None
+            
+            # Device name (same string as v4l2-ctl's "Card type")
+            name = (self._read_sysfs(f'{sysfs_dir}/name')
+                    or (v4l2_cap['card'] if v4l2_cap else None)
+                    or f"Camera {device_num}")
+            
+            # Test if camera is usable
+            cap = cv2.VideoCapture(device_num, self.backend)
+            if not cap.isOpened():
+                return None
+            resolutions = None
+            if probe_resolutions:
+                resolutions = self.get_resolutions(device_num, cap)
+            cap.release()
+            
+            camera_info = {
+                'index': device_num,
+                'name': name,
+                'device': device,
+                'backend': 'V4L2'
+            }
+            if resolutions is not None:
+                camera_info['resolutions'] = resolutions
+            return camera_info
+        except Exception as e:
+            logger.debug(f"Error checking device {device}: {e}")
+            return None
+    
+    def _enumerate_by_index(self, probe_resolutions: bool = False) -> List[Dict[str, any]]:
         """Fallback camera enumeration by testing indices"""
-        cameras = []
+        # Try to detect camera model for non-Linux platforms
+        profile_key = self._detect_usb_camera()
+        
+        indices = range(self.PROBE_INDEX_COUNT)
+        if self.backend == cv2.CAP_V4L2:
+            # V4L2 opens are independent and block in the driver, so check
+            # several indices at once; map() keeps the index order
+            workers = min(len(indices), self.MAX_PROBE_THREADS)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda i: self._probe_index(i, probe_resolutions),
+                                        indices))
+        else:
+            # AVFoundation and DirectShow aren't safe to open from several
+            # threads at once, so probe one index at a time there
+            results = [self._probe_index(i, probe_resolutions) for i in indices]
+        cameras = [camera for camera in results if camera is not None]
         
-        for i in range(10):  # Check first 10 indices
+        self._register_detected(cameras, profile_key)
+        return cameras
+    
+    def _probe_index(self, index: int, probe_resolutions: bool) -> Optional[Dict[str, any]]:
+        """Check whether a camera index can be opened and describe it"""
+        try:
+            cap = cv2.VideoCapture(index, self.backend)
+            if not cap.isOpened():
+                return None
+            # Get camera properties
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = int(cap.get(cv2.CAP_PROP_FPS))
+            
+            resolutions = None
+            if probe_resolutions:
+                resolutions = self.get_resolutions(index, cap)
+            
+            cap.release()
+            
+            camera_info = {
+                'index': index,
+                'name': f"Camera {index}",
+                'device': f"index:{index}",
+                'current_resolution': (width, height),
+                'fps': fps,
+                'backend': self._backend_name()
+            }
+            if resolutions is not None:
+                camera_info['resolutions'] = resolutions
+            return camera_info
+        except:
+            return None
+    
+    def _register_detected(self, cameras: List[Dict[str, any]], profile_key: Optional[str]):
+        """Attach the detected camera profile to enumerated cameras"""
+        camera_profile = self.profiles.get(profile_key, self.profiles.get('generic'))
+        for camera_info in cameras:
+            camera_info['profile_key'] = profile_key or 'generic'
+            camera_info['profile'] = camera_profile
+            if camera_profile and profile_key:
+                camera_info['name'] = camera_profile.name
+                camera_info['model'] = camera_profile.model
+                self.detected_cameras[camera_info['index']] = camera_profile
+    
+    def get_resolutions(self, camera_index: int, cap=None) -> List[Tuple[int, int]]:
+        """Get (cached) supported resolutions of a camera, opening it only if needed
+        
+        Uses the V4L2 driver's frame size list (AVFoundation's format list on
+        macOS) where available and falls back to probing the capture (an
+        open cap may be passed in to reuse it).
+        On Linux, results are also kept on disk per physical camera, keyed on
+        its VIDIOC_QUERYCAP bus/driver/card, so later runs skip the probe.
+        """
+        resolutions = self._res_cache.get(camera_index)
+        if resolutions is not None:
+            return resolutions
+        
+        resolutions = []
+        caps_key = None
+        if self.platform == 'linux':
+            device = f'/dev/video{camera_index}'
+            caps_key = self._caps_cache_key(device)
+            if caps_key is not None:
+                resolutions = self._load_caps_cache().get(caps_key, [])
+            if not resolutions:
+                resolutions = self._v4l2_list_framesizes(device)
+        
+        elif self.backend == cv2.CAP_AVFOUNDATION:
+            resolutions = self._get_supported_resolutions_avfoundation(camera_index)
+        
+        if not resolutions:
+            own_cap = cap is None
+            if own_cap:
+                cap = cv2.VideoCapture(camera_index, self.backend)
             try:
-                cap = cv2.VideoCapture(i, self.backend)
                 if cap.isOpened():
-                    # Get camera properties
-                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    fps = int(cap.get(cv2.CAP_PROP_FPS))
-                    
-                    # Get supported resolutions
                     resolutions = self._get_supported_resolutions(cap)
-                    
+            finally:
+                if own_cap:
                     cap.release()
-                    
-                    # Try to detect camera model for non-Linux platforms
-                    profile_key = self._detect_usb_camera()
-                    camera_profile = self.profiles.get(profile_key, self.profiles.get('generic'))
-                    
-                    camera_info = {
-                        'index': i,
-                        'name': f"Camera {i}",
-                        'device': f"index:{i}",
-                        'resolutions': resolutions,
-                        'current_resolution': (width, height),
-                        'fps': fps,
-                        'backend': self._backend_name(),
-                        'profile_key': profile_key or 'generic',
-                        'profile': camera_profile
-                    }
-                    
-                    if camera_profile and profile_key:
-                        camera_info['name'] = camera_profile.name
-                        camera_info['model'] = camera_profile.model
-                        self.detected_cameras[i] = camera_profile
-                    
-                    cameras.append(camera_info)
-            except:
-                pass
-                
-        return cameras
+        
+        if resolutions:
+            self._res_cache[camera_index] = resolutions
+            if caps_key is not None:
+                # Enumeration probes devices from several threads
+                with self._caps_lock:
+                    if self._caps_cache.get(caps_key) != resolutions:
+                        self._caps_cache[caps_key] = resolutions
+                        self._save_caps_cache()
+        return resolutions
+    
+    def _caps_cache_key(self, device: str) -> Optional[str]:
+        """Key identifying a physical camera across reboots (USB port, driver and model)"""
+        v4l2_cap = self._query_v4l2_cap(device)
+        if v4l2_cap is None or not v4l2_cap['bus_info']:
+            return None
+        return f"{v4l2_cap['bus_info']}|{v4l2_cap['driver']}|{v4l2_cap['version']}|{v4l2_cap['card']}"
+    
+    def _load_caps_cache(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Load the on-disk resolution cache (once)"""
+        with self._caps_lock:
+            if self._caps_cache is None:
+                self._caps_cache = self._read_caps_cache()
+        return self._caps_cache
+    
+    def _read_caps_cache(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Read the resolution cache file, empty if missing or unreadable"""
+        try:
+            if self.CAPS_CACHE_PATH.exists():
+                with open(self.CAPS_CACHE_PATH, 'r') as f:
+                    data = json.load(f)
+                return {key: [tuple(r) for r in resolutions]
+                        for key, resolutions in data.items()}
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable camera caps cache: {e}")
+        return {}
+    
+    def _save_caps_cache(self):
+        """Write the resolution cache to disk"""
+        try:
+            self.CAPS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.CAPS_CACHE_PATH, 'w') as f:
+                json.dump(self._caps_cache, f)
+        except Exception as e:
+            logger.debug(f"Could not write camera caps cache: {e}")
+    
+    def _query_v4l2_cap(self, device: str) -> Optional[Dict[str, Any]]:
+        """Query a V4L2 node's driver, card name, bus and capabilities (VIDIOC_QUERYCAP)"""
+        if not V4L2_IOCTL_AVAILABLE:
+            return None
+        try:
+            fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+        except OSError as e:
+            logger.debug(f"Cannot open {device}: {e}")
+            return None
+        
+        try:
+            cap = V4L2Capability()
+            fcntl.ioctl(fd, VIDIOC_QUERYCAP, cap)
+        except OSError as e:
+            logger.debug(f"VIDIOC_QUERYCAP failed on {device}: {e}")
+            return None
+        finally:
+            os.close(fd)
+        
+        # device_caps describes this node; capabilities covers the whole device
+        caps = cap.device_caps if cap.capabilities & V4L2_CAP_DEVICE_CAPS else cap.capabilities
+        return {
+            'driver': cap.driver.decode(errors='replace'),
+            'card': cap.card.decode(errors='replace'),
+            'bus_info': cap.bus_info.decode(errors='replace'),
+            'version': cap.version,
+            'capture': bool(caps & V4L2_CAP_VIDEO_CAPTURE),
+        }
+    
+    def _v4l2_list_framesizes(self, device: str) -> List[Tuple[int, int]]:
+        """Get discrete frame sizes reported by the V4L2 driver, largest first"""
+        sizes = self._v4l2_enum_framesizes(device)
+        if sizes is None:
+            sizes = self._v4l2_ctl_framesizes(device)
+        return sorted(sizes, key=lambda s: (s[0] * s[1], s[0]), reverse=True)
+    
+    def _v4l2_enum_framesizes(self, device: str) -> Optional[set]:
+        """Enumerate frame sizes of every pixel format with VIDIOC_ENUM_FMT/ENUM_FRAMESIZES
+        
+        Read-only queries: unlike setting a format they never restart the stream.
+        Returns None if the device can't be queried this way.
+        """
+        if not V4L2_IOCTL_AVAILABLE:
+            return None
+        try:
+            fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+        except OSError as e:
+            logger.debug(f"Cannot open {device}: {e}")
+            return None
+        
+        sizes = set()
+        try:
+            # Both lists end with EINVAL at the first index past the last entry
+            fmt = V4L2FmtDesc(type=V4L2_BUF_TYPE_VIDEO_CAPTURE)
+            while True:
+                try:
+                    fcntl.ioctl(fd, VIDIOC_ENUM_FMT, fmt)
+                except OSError:
+                    break
+                frmsize = V4L2FrmSizeEnum(pixel_format=fmt.pixelformat)
+                while True:
+                    try:
+                        fcntl.ioctl(fd, VIDIOC_ENUM_FRAMESIZES, frmsize)
+                    except OSError:
+                        break
+                    if frmsize.type != V4L2_FRMSIZE_TYPE_DISCRETE:
+                        break
+                    sizes.add((frmsize.width, frmsize.height))
+                    frmsize.index += 1
+                fmt.index += 1
+        finally:
+            os.close(fd)
+        
+        return sizes or None
+    
+    def _v4l2_ctl_framesizes(self, device: str) -> set:
+        """Get discrete frame sizes from v4l2-ctl --list-formats-ext"""
+        try:
+            result = subprocess.run(
+                ['v4l2-ctl', '-d', device, '--list-formats-ext'],
+                capture_output=True, text=True, timeout=1
+            )
+        except Exception as e:
+            logger.debug(f"Error listing frame sizes for {device}: {e}")
+            return set()
+        
+        if result.returncode != 0:
+            return set()
+        
+        return {(int(w), int(h)) for w, h in _V4L2_FRAMESIZE_RE.findall(result.stdout)}
+    
+    def _get_supported_resolutions_avfoundation(self, device_index: int) -> List[Tuple[int, int]]:
+        """List a camera's formats from AVFoundation without opening a capture session"""
+        if not AVFOUNDATION_AVAILABLE:
+            return []
+        try:
+            devices = AVFoundation.AVCaptureDevice.devicesWithMediaType_(AVFoundation.AVMediaTypeVideo)
+            if device_index >= len(devices):
+                return []
+            sizes = set()
+            for fmt in devices[device_index].formats():
+                dims = CoreMedia.CMVideoFormatDescriptionGetDimensions(fmt.formatDescription())
+                sizes.add((int(dims.width), int(dims.height)))
+        except Exception as e:
+            logger.debug(f"AVFoundation format query failed for camera {device_index}: {e}")
+            return []
+        return sorted(sizes, key=lambda s: (s[0] * s[1], s[0]), reverse=True)
     
     def _get_supported_resolutions(self, cap) -> List[Tuple[int, int]]:
         """Get list of supported resolutions for a camera"""
@@ -296,7 +836,14 @@ class CameraBackend:
         original_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
         original_height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
         
+        # Drivers snap a request to the nearest mode they support, so once a
+        # probe comes back smaller, every larger candidate is known to miss
+        max_seen_width = None
+        
         for width, height in common_resolutions:
+            if max_seen_width is not None and width > max_seen_width * 1.05:
+                continue
+            
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
             
@@ -305,6 +852,8 @@ class CameraBackend:
             
             if actual_width == width and actual_height == height:
                 supported.append((width, height))
+            elif 0 < actual_width < width:
+                max_seen_width = max(max_seen_width or 0, actual_width)
         
         # Restore original resolution
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, original_width)
@@ -314,34 +863,39 @@ class CameraBackend:
     
     def _backend_name(self) -> str:
         """Get human-readable backend name"""
-        backend_names = {
-            cv2.CAP_AVFOUNDATION: "AVFoundation",
-            cv2.CAP_V4L2: "V4L2",
-            cv2.CAP_DSHOW: "DirectShow",
-            cv2.CAP_ANDROID: "Android",
-            cv2.CAP_ANY: "Auto"
-        }
-        return backend_names.get(self.backend, "Unknown")
+        return self._BACKEND_NAMES.get(self.backend, "Unknown")
     
     def create_capture(self, camera_index: int, **kwargs) -> cv2.VideoCapture:
         """Create a VideoCapture object with platform-specific optimizations"""
+        camera_profile = self.detected_cameras.get(camera_index)
+        
+        # The pipeline can't take arbitrary capture properties, so overrides
+        # go through the regular backend
+        if self.platform == 'linux' and self.is_arm and self.has_gstreamer and not kwargs:
+            cap = self._create_mpp_capture(camera_index, camera_profile)
+            if cap is not None:
+                return cap
+        
         cap = cv2.VideoCapture(camera_index, self.backend)
+        optimal = camera_profile.optimal_settings if camera_profile else {}
+        
+        # MJPG keeps USB 2.0 bandwidth (and the driver's dequeue wait) low on
+        # any host; profiles may ask for another format (e.g. YUYV for color)
+        fourcc = cv2.VideoWriter_fourcc(*optimal.get('format', 'MJPG'))
+        cap.set(cv2.CAP_PROP_FOURCC, fourcc)
+        
+        # On ARM, let libyuv's NEON kernel do YUYV conversion instead of
+        # OpenCV (see make_frame_converter)
+        if (self.is_arm and LIBYUV_AVAILABLE and self.backend == cv2.CAP_V4L2
+                and optimal.get('format') == 'YUYV'):
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        
+        # Keep the driver queue short so frames don't go stale
+        if self.backend in (cv2.CAP_V4L2, cv2.CAP_DSHOW, cv2.CAP_AVFOUNDATION):
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, optimal.get('buffer_size', 1))
         
         # Apply camera profile settings if available
-        camera_profile = self.detected_cameras.get(camera_index)
         if camera_profile:
-            # Apply optimal settings from profile
-            optimal = camera_profile.optimal_settings
-            
-            # Set format if specified
-            if 'format' in optimal:
-                if optimal['format'] == 'MJPG':
-                    fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-                    cap.set(cv2.CAP_PROP_FOURCC, fourcc)
-                elif optimal['format'] == 'YUYV':
-                    fourcc = cv2.VideoWriter_fourcc(*'YUYV')
-                    cap.set(cv2.CAP_PROP_FOURCC, fourcc)
-            
             # Apply camera control settings
             if 'brightness' in optimal and optimal['brightness'] != 'auto':
                 cap.set(cv2.CAP_PROP_BRIGHTNESS, optimal['brightness'])
@@ -355,15 +909,8 @@ class CameraBackend:
                 cap.set(cv2.CAP_PROP_EXPOSURE, optimal['exposure'])
         
         if self.platform == 'linux' and self.is_arm:
-            # Optimizations for ARM Linux (RK3568)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer to minimize latency
-            
-            # Try to set MJPEG format for better performance
-            fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-            cap.set(cv2.CAP_PROP_FOURCC, fourcc)
-            
             # Set reasonable FPS for embedded system
-            cap.set(cv2.CAP_PROP_FPS, 30)
+            cap.set(cv2.CAP_PROP_FPS, self.ARM_CAPTURE_FPS)
         
         # Apply any additional settings
         for prop, value in kwargs.items():
@@ -372,53 +919,150 @@ class CameraBackend:
         
         return cap
     
-    def get_optimal_resolution(self, cap, target_width: int = 1920) -> Tuple[int, int]:
-        """Get optimal resolution based on camera capabilities and system resources"""
-        resolutions = self._get_supported_resolutions(cap)
+    def _create_mpp_capture(self, camera_index: int,
+                            camera_profile: Optional[CameraProfile]) -> Optional[cv2.VideoCapture]:
+        """Open an MJPEG camera through GStreamer with hardware JPEG decode, or None"""
+        optimal = camera_profile.optimal_settings if camera_profile else {}
+        if optimal.get('format', 'MJPG') != 'MJPG':
+            return None
+        
+        # Profile controls are applied by v4l2src when it opens the device;
+        # any the pipeline can't express keep the camera on the V4L2 path
+        controls = {}
+        for name in ('brightness', 'contrast', 'saturation', 'gain', 'exposure'):
+            value = optimal.get(name, 'auto')
+            if value == 'auto':
+                continue
+            if name not in self._MPP_CONTROLS:
+                return None
+            controls[name] = int(value)
+        extra = ''
+        if controls:
+            extra = ' extra-controls="c,{}"'.format(
+                ','.join(f"{name}={value}" for name, value in controls.items()))
+        
+        if camera_profile:
+            width, height = camera_profile.get_optimal_resolution(1366)
+        else:
+            width, height = 1280, 720
+        
+        pipeline = self.MPP_MJPEG_PIPELINE.format(index=camera_index, controls=extra,
+                                                  width=width, height=height,
+                                                  fps=self.ARM_CAPTURE_FPS)
+        try:
+            cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        except Exception as e:
+            logger.debug(f"GStreamer capture failed for camera {camera_index}: {e}")
+            return None
+        
+        if not cap.isOpened():
+            cap.release()
+            logger.debug(f"MPP JPEG decode unavailable for camera {camera_index}, using {self._backend_name()}")
+            return None
+        
+        logger.info(f"Camera {camera_index} opened via GStreamer with MPP JPEG decode")
+        return cap
+    
+    def get_optimal_resolution(self, camera_index: int, target_width: int = 1920,
+                               resolutions: Optional[List[Tuple[int, int]]] = None) -> Tuple[int, int]:
+        """Get optimal resolution based on camera capabilities and system resources
+        
+        Pass resolutions (e.g. an enumerate_cameras() entry's list) to skip the
+        lookup; otherwise the cached get_resolutions() list is used.
+        """
+        if resolutions is None:
+            resolutions = self.get_resolutions(camera_index)
         
         if not resolutions:
             return (1280, 720)  # Default fallback
         
-        # For embedded systems, prefer lower resolutions
-        if self.is_arm:
-            # Find resolution closest to 1366x768 (display size)
-            target_pixels = 1366 * 768
-            best_resolution = min(resolutions, 
-                                 key=lambda r: abs(r[0] * r[1] - target_pixels))
-        else:
-            # Find resolution closest to target width
-            best_resolution = min(resolutions, 
-                                 key=lambda r: abs(r[0] - target_width))
+        # For embedded systems, prefer the resolution closest to 1366x768 (display
+        # size) in pixel count; otherwise the one closest to the target width
+        target_pixels = 1366 * 768
+        best_resolution = resolutions[0]
+        best_diff = None
+        for width, height in resolutions:
+            diff = abs(width * height - target_pixels) if self.is_arm else abs(width - target_width)
+            if best_diff is None or diff < best_diff:
+                best_resolution = (width, height)
+                best_diff = diff
         
         return best_resolution
     
+    def make_frame_converter(self, cap) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+        """Get the function turning a capture's frames into BGR, None if already BGR
+        
+        Call once the resolution is final; raw frames carry no dimensions.
+        """
+        if cap.get(cv2.CAP_PROP_CONVERT_RGB) != 0 or self.get_fourcc(cap) != 'YUYV':
+            return None
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return lambda frame: convert_yuy2_to_bgr(frame, width, height)
+    
+    def get_fourcc(self, cap) -> str:
+        """Get the pixel format negotiated by a capture as a FOURCC string"""
+        code = int(cap.get(cv2.CAP_PROP_FOURCC))
+        if not code:
+            return "Unknown"
+        return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    
     def get_camera_profile(self, camera_index: int) -> Optional[CameraProfile]:
         """Get camera profile for a specific camera index"""
         return self.detected_cameras.get(camera_index)
     
-    def apply_profile_image_processing(self, image: np.ndarray, camera_index: int) -> np.ndarray:
-        """Apply camera-specific image processing based on profile"""
+    def _get_gamma_table(self, gamma: float) -> np.ndarray:
+        """Get (cached) 256-entry gamma correction lookup table"""
+        table = self._gamma_cache.get(gamma)
+        if table is None:
+            inv_gamma = 1.0 / gamma
+            table = ((np.arange(256) / 255.0) ** inv_gamma * 255).astype(np.uint8)
+            self._gamma_cache[gamma] = table
+        return table
+    
+    def make_profile_processor(self, camera_index: int) -> Optional[Callable[..., np.ndarray]]:
+        """Build the camera-specific image processing function for a camera
+        
+        Returns None when the camera has no profile or its processing is a
+        no-op, so callers can skip the per-frame call entirely. The returned
+        function takes (image, dst=None); dst may be the input to work in place.
+        """
         profile = self.detected_cameras.get(camera_index)
         if not profile or not profile.image_processing:
-            return image
+            return None
         
-        processing = profile.image_processing
+        # Gamma correction table
+        table = None
+        if profile.gamma_correction != 1.0:
+            table = self._get_gamma_table(profile.gamma_correction)
         
-        # Apply gamma correction if needed
-        if processing.get('gamma_correction', 1.0) != 1.0:
-            gamma = processing['gamma_correction']
-            inv_gamma = 1.0 / gamma
-            table = np.array([((i / 255.0) ** inv_gamma) * 255 
-                            for i in np.arange(0, 256)]).astype("uint8")
-            image = cv2.LUT(image, table)
-        
-        # Apply denoise if needed
-        if processing.get('denoise_strength', 0) > 0:
-            strength = processing['denoise_strength']
-            image = cv2.fastNlMeansDenoisingColored(image, None, 
-                                                   h=10 * strength,
-                                                   hColor=10 * strength,
-                                                   templateWindowSize=7,
-                                                   searchWindowSize=21)
-        
-        return image
\ No newline at end of file
+        strength = profile.denoise_strength
+        
+        if table is None and strength <= 0:
+            return None
+        
+        sigma_color = 25 * strength
+        sigma_space = 7 * strength
+        use_opencl = self.use_opencl
+        
+        def process(image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+            # Apply gamma correction if needed
+            if table is not None:
+                image = cv2.LUT(image, table, dst=dst)
+            
+            # Apply edge-preserving denoise if needed (bilateral filter cannot run in place)
+            if strength > 0:
+                if use_opencl:
+                    image = cv2.bilateralFilter(cv2.UMat(image), 0, sigma_color, sigma_space).get()
+                else:
+                    image = cv2.bilateralFilter(image, 0, sigma_color, sigma_space)
+            return image
+        
+        return process
+    
+    def apply_profile_image_processing(self, image: np.ndarray, camera_index: int) -> np.ndarray:
+        """Apply camera-specific image processing based on profile"""
+        processor = self.make_profile_processor(camera_index)
+        if processor is None:
+            return image
+        return processor(image)
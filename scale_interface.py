@@ -1,11 +1,11 @@
 import serial
 import serial.tools.list_ports
 import threading
-import queue
 import time
 import re
 import logging
-from typing import Optional, List, Dict, Callable
+from typing import Optional, List, Dict, Callable, Union
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 
@@ -22,6 +22,10 @@ class ScaleProtocol(Enum):
 @dataclass
 class ScaleReading:
     """Data class for scale readings"""
+    # Explicit slots (dataclass(slots=True) needs Python 3.10) keep each
+    # reading free of a per-instance __dict__
+    __slots__ = ('weight', 'unit', 'stable', 'timestamp', 'raw_data')
+    
     weight: float
     unit: str
     stable: bool
@@ -34,32 +38,38 @@ class ScaleInterface:
     # Protocol patterns for different scale manufacturers
     PROTOCOL_PATTERNS = {
         ScaleProtocol.TOLEDO: {
-            'pattern': r'([+-]?\d+\.?\d*)\s*(kg|g|lb|oz)',
+            'pattern': re.compile(r'([+-]?\d+\.?\d*)\s*(kg|g|lb|oz)'),
             'stable_indicator': 'S',
-            'commands': {'zero': 'Z\r\n', 'tare': 'T\r\n', 'print': 'P\r\n'}
+            'commands': {'zero': b'Z\r\n', 'tare': b'T\r\n', 'print': b'P\r\n'}
         },
         ScaleProtocol.OHAUS: {
-            'pattern': r'([+-]?\d+\.?\d*)\s*(kg|g|lb|oz)',
+            'pattern': re.compile(r'([+-]?\d+\.?\d*)\s*(kg|g|lb|oz)'),
             'stable_indicator': 'S',
-            'commands': {'zero': 'Z\r', 'tare': 'T\r', 'print': 'P\r'}
+            'commands': {'zero': b'Z\r', 'tare': b'T\r', 'print': b'P\r'}
         },
         ScaleProtocol.AND: {
-            'pattern': r'ST,([+-]\d+\.\d+)\s*(kg|g)',
+            'pattern': re.compile(r'ST,([+-]\d+\.\d+)\s*(kg|g)'),
             'stable_indicator': 'ST',
-            'commands': {'zero': 'Z\r\n', 'tare': 'T\r\n', 'request': 'Q\r\n'}
+            'commands': {'zero': b'Z\r\n', 'tare': b'T\r\n', 'request': b'Q\r\n'}
         },
         ScaleProtocol.METTLER: {
-            'pattern': r'S\s+([+-]?\d+\.?\d*)\s*(kg|g|lb)',
+            'pattern': re.compile(r'S\s+([+-]?\d+\.?\d*)\s*(kg|g|lb)'),
             'stable_indicator': 'S',
-            'commands': {'zero': 'Z\r\n', 'tare': 'T\r\n', 'send_stable': 'SI\r\n'}
+            'commands': {'zero': b'Z\r\n', 'tare': b'T\r\n', 'send_stable': b'SI\r\n'}
         },
         ScaleProtocol.GENERIC: {
-            'pattern': r'([+-]?\d+\.?\d*)\s*(kg|g|lb|oz)',
+            'pattern': re.compile(r'([+-]?\d+\.?\d*)\s*(kg|g|lb|oz)'),
             'stable_indicator': None,
             'commands': {}
         }
     }
     
+    # Port descriptions that likely belong to a scale's serial adapter
+    PORT_KEYWORDS = re.compile(r'usb|serial|uart|scale|ftdi|ch340', re.I)
+    
+    # Readings kept for get_weight; older ones are dropped
+    QUEUE_SIZE = 16
+    
     def __init__(self, 
                  port: Optional[str] = None,
                  baudrate: int = 9600,
@@ -83,14 +93,34 @@ class ScaleInterface:
         # Threading for continuous reading
         self.read_thread = None
         self.stop_reading = threading.Event()
-        self.data_queue = queue.Queue()
+        # Bounded so readings nobody consumes can't pile up; the event wakes
+        # get_weight when the read thread appends
+        self.data_queue = deque(maxlen=self.QUEUE_SIZE)
+        self._data_event = threading.Event()
         self.last_reading = None
-        self.callbacks = []
+        # Replaced, never mutated, so the read thread can iterate it unlocked
+        self.callbacks: tuple = ()
         
         # Auto-detect port if not specified
         if not self.port:
             self.port = self.auto_detect_scale()
     
+    @property
+    def protocol(self) -> ScaleProtocol:
+        """Scale protocol in use"""
+        return self._protocol
+    
+    @protocol.setter
+    def protocol(self, protocol: ScaleProtocol):
+        # Resolve the protocol's pattern and commands once per change
+        self._protocol = protocol
+        config = self.PROTOCOL_PATTERNS[protocol]
+        self._pattern = config['pattern']
+        self._stable_indicator = config.get('stable_indicator')
+        commands = config['commands']
+        self._cmd_zero = commands.get('zero')
+        self._cmd_tare = commands.get('tare')
+    
     def auto_detect_scale(self) -> Optional[str]:
         """Auto-detect scale on serial ports"""
         logger.info("Auto-detecting scale...")
@@ -114,7 +144,7 @@ class ScaleInterface:
                         
                         # Check if data matches any known pattern
                         for protocol, config in self.PROTOCOL_PATTERNS.items():
-                            if re.search(config['pattern'], data):
+                            if config['pattern'].search(data):
                                 logger.info(f"Scale detected on {port} using {protocol.value} protocol")
                                 self.protocol = protocol
                                 return port
@@ -130,16 +160,13 @@ class ScaleInterface:
         ports = []
         
         for port in serial.tools.list_ports.comports():
-            port_info = {
-                'device': port.device,
-                'description': port.description,
-                'hwid': port.hwid
-            }
-            
             # Filter for likely scale ports
-            if any(keyword in port.description.lower() 
-                   for keyword in ['usb', 'serial', 'uart', 'scale', 'ftdi', 'ch340']):
-                ports.append(port_info)
+            if self.PORT_KEYWORDS.search(port.description or ''):
+                ports.append({
+                    'device': port.device,
+                    'description': port.description,
+                    'hwid': port.hwid
+                })
                 
         return ports
     
@@ -202,24 +229,30 @@ class ScaleInterface:
     
     def _read_loop(self):
         """Continuous reading loop"""
-        buffer = ""
+        # Raw bytes are buffered and only complete lines are decoded
+        buffer = bytearray()
         
         while not self.stop_reading.is_set() and self.is_connected:
             try:
-                if self.serial_port.in_waiting > 0:
-                    data = self.serial_port.read(self.serial_port.in_waiting)
-                    buffer += data.decode('utf-8', errors='ignore')
+                # Block (up to the port timeout) for the first byte, then take
+                # whatever else has already arrived, so an idle scale costs no CPU
+                data = self.serial_port.read(max(1, self.serial_port.in_waiting))
+                if data:
+                    buffer += data
                     
                     # Process complete lines
-                    while '\n' in buffer or '\r' in buffer:
-                        line, buffer = self._extract_line(buffer)
+                    while True:
+                        line = self._extract_line(buffer)
+                        if line is None:
+                            break
                         
                         if line:
                             reading = self._parse_reading(line)
                             
                             if reading:
                                 self.last_reading = reading
-                                self.data_queue.put(reading)
+                                self.data_queue.append(reading)
+                                self._data_event.set()
                                 
                                 # Call callbacks
                                 for callback in self.callbacks:
@@ -227,39 +260,39 @@ class ScaleInterface:
                                         callback(reading)
                                     except Exception as e:
                                         logger.error(f"Callback error: {e}")
-                                        
-                time.sleep(0.01)  # Small delay to prevent CPU spinning
                 
             except Exception as e:
                 logger.error(f"Read error: {e}")
                 time.sleep(0.1)
     
-    def _extract_line(self, buffer: str) -> tuple[str, str]:
-        """Extract a complete line from buffer"""
-        # Find line ending
-        end_idx = -1
-        for delimiter in ['\r\n', '\n', '\r']:
-            idx = buffer.find(delimiter)
-            if idx != -1 and (end_idx == -1 or idx < end_idx):
-                end_idx = idx
-                
-        if end_idx != -1:
-            line = buffer[:end_idx].strip()
-            buffer = buffer[end_idx+1:]
-            return line, buffer
-            
-        return "", buffer
+    def _extract_line(self, buffer: bytearray) -> Optional[str]:
+        """Remove a complete line from the front of buffer and return it decoded
+        
+        Returns None when the buffer holds no complete line yet.
+        """
+        # Earliest of \r or \n ends the line
+        nl = buffer.find(b'\n')
+        cr = buffer.find(b'\r')
+        end_idx = nl if cr == -1 or (nl != -1 and nl < cr) else cr
+        if end_idx == -1:
+            return None
+        
+        line = buffer[:end_idx].decode('utf-8', errors='ignore').strip()
+        # Swallow the second half of a \r\n / \n\r pair along with the first
+        cut = end_idx + 1
+        if cut < len(buffer) and buffer[cut] in b'\r\n' and buffer[cut] != buffer[end_idx]:
+            cut += 1
+        del buffer[:cut]
+        return line
     
     def _parse_reading(self, data: str) -> Optional[ScaleReading]:
         """Parse scale reading from raw data"""
         if not data:
             return None
             
-        config = self.PROTOCOL_PATTERNS[self.protocol]
-        pattern = config['pattern']
-        stable_indicator = config.get('stable_indicator')
+        stable_indicator = self._stable_indicator
         
-        match = re.search(pattern, data)
+        match = self._pattern.search(data)
         if match:
             try:
                 weight = float(match.group(1))
@@ -298,12 +331,16 @@ class ScaleInterface:
         while time.time() - start_time < timeout:
             try:
                 # Try to get from queue
-                reading = self.data_queue.get(timeout=0.1)
+                reading = self.data_queue.popleft()
                 
                 if not stable_only or reading.stable:
                     return reading
                     
-            except queue.Empty:
+            except IndexError:
+                # Clear before re-checking so an append in between isn't missed
+                self._data_event.clear()
+                if self.data_queue or self._data_event.wait(0.1):
+                    continue
                 # Check last reading
                 if self.last_reading:
                     if not stable_only or self.last_reading.stable:
@@ -311,13 +348,15 @@ class ScaleInterface:
                         
         return None
     
-    def send_command(self, command: str) -> bool:
+    def send_command(self, command: Union[bytes, str]) -> bool:
         """Send command to scale"""
         if not self.is_connected:
             return False
             
+        if isinstance(command, str):
+            command = command.encode('utf-8')
         try:
-            self.serial_port.write(command.encode('utf-8'))
+            self.serial_port.write(command)
             return True
         except Exception as e:
             logger.error(f"Failed to send command: {e}")
@@ -325,34 +364,30 @@ class ScaleInterface:
     
     def zero_scale(self) -> bool:
         """Zero the scale"""
-        config = self.PROTOCOL_PATTERNS[self.protocol]
-        command = config['commands'].get('zero')
-        
-        if command:
-            return self.send_command(command)
+        if self._cmd_zero:
+            return self.send_command(self._cmd_zero)
         
         logger.warning(f"Zero command not available for {self.protocol.value} protocol")
         return False
     
     def tare_scale(self) -> bool:
         """Tare the scale"""
-        config = self.PROTOCOL_PATTERNS[self.protocol]
-        command = config['commands'].get('tare')
-        
-        if command:
-            return self.send_command(command)
+        if self._cmd_tare:
+            return self.send_command(self._cmd_tare)
         
         logger.warning(f"Tare command not available for {self.protocol.value} protocol")
         return False
     
     def add_callback(self, callback: Callable[[ScaleReading], None]):
         """Add callback for new readings"""
-        self.callbacks.append(callback)
+        self.callbacks = self.callbacks + (callback,)
     
     def remove_callback(self, callback: Callable[[ScaleReading], None]):
         """Remove callback"""
         if callback in self.callbacks:
-            self.callbacks.remove(callback)
+            callbacks = list(self.callbacks)
+            callbacks.remove(callback)
+            self.callbacks = tuple(callbacks)
     
     def __enter__(self):
         """Context manager entry"""